@@ -1,5 +1,12 @@
+import pandas as pd
 import streamlit as st
 
+# Pages get views that share the loaded frame's column buffers (see
+# features.with_features); Copy-on-Write, always on from pandas 3, keeps a
+# page's writes to its view from reaching the shared frame.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 st.set_page_config(
     page_title="UMK Insomnia Dashboard",
     page_icon="😴",
@@ -0,0 +1,128 @@
+"""
+Compute every dashboard page headless and write the results to disk.
+
+    python batch.py survey.csv -o out/ [--pages home nash] [--jobs 4] [--format parquet]
+
+For each page, <out>/<page>.json holds its metrics, aggregate tables and
+Plotly figures (with --format parquet the tables are written next to it
+as <out>/<page>/<table>.parquet). <out>/manifest.json records the input,
+its data version and per-page timings, for nightly runs and benchmarks.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dashboard import PAGES, compute_page
+from frame_cache import frame_version
+from ingest import read_survey_file
+
+
+def _jsonable(value):
+    """`value` with numpy scalars unwrapped and NaN as null."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _table(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    `table` with a labelled index moved into columns and string column
+    names, as a new frame: page tables are cached and shared.
+    """
+    if not isinstance(table.index, pd.RangeIndex):
+        table = table.reset_index()
+    return table.set_axis([str(c) for c in table.columns], axis=1)
+
+
+def run_page(df: pd.DataFrame, page: str) -> dict:
+    start = time.perf_counter()
+    result = compute_page(df, page)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_pages(df: pd.DataFrame, pages, jobs: int = 1) -> dict:
+    """
+    run_page() for each page; with jobs > 1, on that many threads. Threads
+    rather than processes: the pages share cached features, cubes and
+    stats (all thread-safe), which worker processes would each rebuild.
+    """
+    if jobs <= 1 or len(pages) <= 1:
+        return {page: run_page(df, page) for page in pages}
+    with ThreadPoolExecutor(max_workers=min(jobs, len(pages))) as pool:
+        return dict(zip(pages, pool.map(lambda page: run_page(df, page), pages)))
+
+
+def write_page(page: str, result: dict, out: str, fmt: str) -> None:
+    tables = {}
+    for name, table in result["tables"].items():
+        table = _table(table)
+        if fmt == "parquet":
+            path = os.path.join(page, f"{name}.parquet")
+            os.makedirs(os.path.join(out, page), exist_ok=True)
+            table.to_parquet(os.path.join(out, path), index=False)
+            tables[name] = path
+        else:
+            tables[name] = json.loads(table.to_json(orient="records", date_format="iso"))
+
+    doc = {
+        "page": page,
+        "rows": result["rows"],
+        "seconds": result["seconds"],
+        "metrics": _jsonable(result["metrics"]),
+        "tables": tables,
+        "figures": {fid: json.loads(fig.to_json()) for fid, fig in result["figures"].items()},
+    }
+    with open(os.path.join(out, f"{page}.json"), "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compute all dashboard pages without Streamlit.")
+    parser.add_argument("data", help="survey CSV (as downloaded from the sheet) or Parquet file")
+    parser.add_argument("-o", "--out", default="batch_out", help="output directory (default: batch_out)")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES), help="pages to compute (default: all)")
+    parser.add_argument("--jobs", type=int, default=1, help="pages computed in parallel (default: 1)")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json", help="format of the aggregate tables")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = read_survey_file(args.data)
+    load_seconds = time.perf_counter() - start
+
+    results = run_pages(df, args.pages, args.jobs)
+
+    os.makedirs(args.out, exist_ok=True)
+    for page, result in results.items():
+        write_page(page, result, args.out, args.format)
+
+    manifest = {
+        "source": os.path.abspath(args.data),
+        "data_version": frame_version(df),
+        "rows": len(df),
+        "load_seconds": load_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "pages": {page: {"seconds": r["seconds"], "figures": list(r["figures"])} for page, r in results.items()},
+    }
+    with open(os.path.join(args.out, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    for page, result in results.items():
+        print(f"{page:<8} {result['seconds'] * 1000:8.0f} ms  {len(result['figures'])} figures")
+    print(f"{'total':<8} {manifest['total_seconds'] * 1000:8.0f} ms  -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from frame_cache import VersionedCache, frame_version
+
+
+# ============================================================
+# Aggregation cube
+# ============================================================
+# Counts (and per-measure sums / non-missing counts) over pairs of
+# categorical dimensions, built from the category codes with one bincount
+# per table. Every table keeps a trailing "missing" slot on each axis, so
+# a 1-D marginal is the exact sum over the other axis. Tables are built
+# on first use and kept with the cube, i.e. once per data version; after
+# that a marginal costs a small array sum, whatever the row count.
+class Cube:
+    def __init__(self, df: pd.DataFrame, dims=None, measures=None):
+        if dims is None:
+            dims = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+        if measures is None:
+            measures = [
+                c for c in df.columns
+                if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+            ]
+
+        # read-only views of the category codes, as narrow as the category
+        # count (int8 up to 127): _table widens the two it tabulates before
+        # the cell-index arithmetic, which would overflow
+        self._codes = {c: df[c].array.codes for c in dims}
+        self._labels = {c: df[c].cat.categories for c in dims}
+        # float measures are views too; other numbers widen, text is coerced
+        self._values = {m: self._measure(df[m]) for m in measures}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _measure(s: pd.Series) -> np.ndarray:
+        if not pd.api.types.is_numeric_dtype(s):
+            s = pd.to_numeric(s, errors="coerce")
+        return s.to_numpy(dtype=float, na_value=np.nan)
+
+    @property
+    def dims(self) -> list:
+        return list(self._codes)
+
+    @property
+    def measures(self) -> list:
+        return list(self._values)
+
+    def _table(self, row: str, col, measure=None):
+        """
+        (len(row)+1, len(col)+1) cell counts, or (sums, non-missing counts)
+        for `measure`. `col=None` tabulates `row` alone (one column).
+        """
+        key = (row, col, measure)
+        with self._lock:
+            table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        nr = len(self._labels[row]) + 1
+        nc = 1 if col is None else len(self._labels[col]) + 1
+        # code -1 (missing) -> trailing slot
+        cell = (self._codes[row].astype(np.intp) % nr) * nc
+        if col is not None:
+            cell = cell + self._codes[col].astype(np.intp) % nc
+        if measure is None:
+            table = np.bincount(cell, minlength=nr * nc).reshape(nr, nc)
+        else:
+            values = self._values[measure]
+            present = ~np.isnan(values)
+            sums = np.bincount(cell[present], weights=values[present], minlength=nr * nc).reshape(nr, nc)
+            nobs = np.bincount(cell[present], minlength=nr * nc).reshape(nr, nc)
+            table = (sums, nobs)
+
+        with self._lock:
+            self._tables[key] = table
+        return table
+
+    def _marginal(self, row: str, col, measure):
+        if col is not None:
+            return self._table(row, col, measure)
+
+        # Sum a table that already has `row` over its other axis;
+        # tabulate `row` on its own otherwise.
+        with self._lock:
+            keys = [k for k in self._tables if k[2] == measure and row in k[:2]]
+        if keys:
+            r, c, _ = keys[0]
+            axis = 1 if r == row else 0
+        else:
+            r, c, axis = row, None, 1
+
+        table = self._table(r, c, measure)
+        if measure is None:
+            return table.sum(axis=axis)
+        return tuple(t.sum(axis=axis) for t in table)
+
+    def _label(self, values: np.ndarray, row: str, col=None):
+        """Drop the missing slots and attach category labels."""
+        if col is None:
+            return pd.Series(values[:-1], index=pd.Index(self._labels[row], name=row))
+        return pd.DataFrame(
+            values[:-1, :-1],
+            index=pd.Index(self._labels[row], name=row),
+            columns=pd.Index(self._labels[col], name=col),
+        )
+
+    def counts(self, row: str, col: str = None):
+        """`value_counts` (Series, category order) or `crosstab` (DataFrame) over all categories."""
+        return self._label(self._marginal(row, col, None), row, col)
+
+    def sums(self, measure: str, row: str, col: str = None):
+        return self._label(self._marginal(row, col, measure)[0], row, col)
+
+    def means(self, measure: str, row: str, col: str = None):
+        sums, nobs = self._marginal(row, col, measure)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._label(sums / nobs, row, col)
+
+
+_CUBES = VersionedCache(max_entries=64, max_bytes=128 * 1024 * 1024, name="cubes")
+
+
+def get_cube(df: pd.DataFrame) -> Cube:
+    """Cube over `df`'s categorical columns, shared per data version."""
+    return _CUBES.get_or_compute("cube", frame_version(df), lambda: Cube(df), key=tuple(df.columns))
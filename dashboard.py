@@ -0,0 +1,640 @@
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from cleaning_aelyana import prepare_aelyana_data
+from cleaning_nazifa import prepare_nazifa_data
+from cube import get_cube
+from frame_cache import page_cached
+from plots import box_figure, cached_figure, histogram_figure, violin_figure
+from running_stats import running_stats
+from schema import ACADEMIC_ORDER, BEDTIME_ORDER, FREQ_ORDER, IMPACT_ORDER
+from scoring import INDEX_SPECS
+
+pio.templates.default = "plotly_white"
+
+
+# ============================================================
+# Dashboard computations
+# ============================================================
+# Everything a page shows except the st.* calls: its frame, metric
+# values, aggregate tables and figures. Nothing here needs a Streamlit
+# session, so batch.py runs the same code headless. Results are cached
+# per data version (frame_cache.page_cached, plots.cached_figure).
+SUNSET = px.colors.sequential.Sunset
+SLEEP_CAT_ORDER = ["Short (<6h)", "Adequate (6–8h)", "Long (>8h)"]
+INSOMNIA_ORDER = INDEX_SPECS["isi_academic"]["category"]["labels"]
+
+# Columns the Sleep Patterns page renders (built lazily, see cleaning_nazifa)
+NAZIFA_PAGE_FEATURES = [
+    "SleepHours_est",
+    "SleepQuality_num",
+    "SleepDurationCategory",
+    "BedTime_order",
+    "FrequentDifficultyFallingAsleep",
+    "FrequentNightWakeups",
+    "LateBedtime",
+]
+
+# Columns the Academic Impact page renders (built lazily, see cleaning_aelyana)
+AELYANA_PAGE_FEATURES = [
+    "InsomniaSeverity_index",
+    "Insomnia_Category",
+    "AcademicPerformance",
+    "AssignmentImpact",
+    "ConcentrationDifficulty",
+    "DaytimeFatigue",
+    "SleepHours_est",
+    "DaytimeFatigue_numeric",
+    "ConcentrationDifficulty_numeric",
+    "MissedClasses_numeric",
+    "AcademicPerformance_numeric",
+    "GPA_numeric",
+    "CGPA_numeric",
+]
+
+CORR_COLUMNS = [
+    "SleepHours_est",
+    "InsomniaSeverity_index",
+    "DaytimeFatigue_numeric",
+    "ConcentrationDifficulty_numeric",
+    "MissedClasses_numeric",
+    "AcademicPerformance_numeric",
+    "GPA_numeric",
+    "CGPA_numeric",
+]
+
+
+def pct(n, total):
+    return (n / total * 100) if total else 0.0
+
+
+def safe_mode(s: pd.Series, default="N/A"):
+    s = s.dropna()
+    return s.mode().iloc[0] if not s.empty else default
+
+
+def _has(*columns):
+    """Availability check: all of `columns` are in the page frame."""
+    return lambda df: set(columns).issubset(df.columns)
+
+
+# ============================================================
+# Home
+# ============================================================
+def home_metrics(df: pd.DataFrame) -> dict:
+    """Key summary metrics; a metric is left out when its column is missing."""
+    def compute():
+        total = len(df)
+        stats = running_stats(df, "overall")
+        out = {"total_responses": total}
+        if "SleepHours_est" in df:
+            out["avg_sleep_hours"] = stats.mean("sleep_hours")
+        if "InsomniaSeverity_index" in df:
+            out["high_insomnia_risk"] = int(stats.sum("high_isi"))
+            out["high_insomnia_risk_pct"] = pct(out["high_insomnia_risk"], total)
+        if "StressLevel" in df:
+            out["high_stress"] = int(stats.sum("high_stress"))
+            out["high_stress_pct"] = pct(out["high_stress"], total)
+        return out
+
+    return page_cached(df, "home", "metrics", compute)
+
+
+def _present(counts: pd.Series) -> pd.Series:
+    """`counts` without the categories a filtered view has no rows for."""
+    return counts[counts > 0]
+
+
+def _by_count(counts: pd.Series) -> pd.Series:
+    """
+    _present(counts), largest first. The sort is stable, so ties keep the
+    canonical answer order (the scale, else alphabetical) on every run.
+    """
+    return _present(counts).sort_values(ascending=False, kind="stable")
+
+
+def faculty_counts(df: pd.DataFrame) -> pd.DataFrame:
+    return page_cached(df, "home", "faculty_counts", lambda: (
+        _by_count(get_cube(df).counts("Faculty")).head(10)
+        .rename_axis("Faculty").reset_index(name="Count")
+    ))
+
+
+def isi_figure(df: pd.DataFrame):
+    fig = histogram_figure(
+        df,
+        x="InsomniaSeverity_index",
+        nbins=10,
+        title="Insomnia Severity Index (ISI) Distribution",
+    )
+    fig.update_layout(xaxis_title="ISI Score", yaxis_title="Number of Students")
+    return fig
+
+
+def faculty_figure(df: pd.DataFrame):
+    fig = px.bar(
+        faculty_counts(df),
+        x="Count",
+        y="Faculty",
+        orientation="h",
+        title="Top Faculties Represented in Survey",
+    )
+    fig.update_layout(
+        xaxis_title="Number of Students",
+        yaxis_title="Faculty",
+    )
+    return fig
+
+
+# ============================================================
+# Lifestyle & Stress Factors (page_nash)
+# ============================================================
+def nash_metrics(df: pd.DataFrame) -> dict:
+    """Prevalence of each lifestyle risk, in % of respondents."""
+    def compute():
+        total = len(df)
+        stats = running_stats(df, "overall")
+        return {
+            "frequent_device_use_pct": pct(stats.sum("high_device"), total),
+            "high_caffeine_pct": pct(stats.sum("high_caffeine"), total),
+            "low_activity_pct": pct(stats.sum("low_activity"), total),
+            "high_stress_pct": pct(stats.sum("high_stress"), total),
+        }
+
+    return page_cached(df, "nash", "metrics", compute)
+
+
+def device_counts(df: pd.DataFrame) -> pd.DataFrame:
+    return page_cached(df, "nash", "device_counts", lambda: (
+        _by_count(get_cube(df).counts("DeviceUsage"))
+        .rename_axis("DeviceUsage").reset_index(name="Count")
+    ))
+
+
+def device_usage_figure(df: pd.DataFrame):
+    fig = px.bar(
+        device_counts(df),
+        x="DeviceUsage",
+        y="Count",
+        title="Distribution of Device Usage Frequency Before Sleep",
+    )
+    fig.update_layout(
+        xaxis_title="Device Usage Frequency",
+        yaxis_title="Number of Students"
+    )
+    return fig
+
+
+def device_isi_figure(df: pd.DataFrame):
+    fig = box_figure(
+        df,
+        x="DeviceUsage",
+        y="InsomniaSeverity_index",
+        title="Insomnia Severity Across Device Usage Levels",
+    )
+    fig.update_layout(
+        xaxis_title="Device Usage Before Sleep",
+        yaxis_title="Insomnia Severity Index (ISI)"
+    )
+    return fig
+
+
+def caffeine_isi_figure(df: pd.DataFrame):
+    fig = box_figure(
+        df,
+        x="CaffeineConsumption",
+        y="InsomniaSeverity_index",
+        title="Insomnia Severity Across Caffeine Consumption Levels",
+    )
+    fig.update_layout(
+        xaxis_title="Caffeine Consumption Frequency",
+        yaxis_title="Insomnia Severity Index (ISI)"
+    )
+    return fig
+
+
+def stress_isi_figure(df: pd.DataFrame):
+    fig = violin_figure(
+        df,
+        x="StressLevel",
+        y="InsomniaSeverity_index",
+        box=True,
+        title="Insomnia Severity Across Academic Stress Levels",
+    )
+    fig.update_layout(
+        xaxis_title="Academic Stress Level",
+        yaxis_title="Insomnia Severity Index (ISI)"
+    )
+    return fig
+
+
+def lifestyle_risk_figure(df: pd.DataFrame):
+    fig = px.scatter(
+        df,
+        x="Lifestyle_Risk",
+        y="InsomniaSeverity_index",
+        opacity=0.75,
+        title="Accumulated Lifestyle Risk Score vs Insomnia Severity",
+    )
+    fig.update_layout(
+        xaxis_title="Lifestyle Risk Score",
+        yaxis_title="Insomnia Severity Index (ISI)"
+    )
+    return fig
+
+
+# ============================================================
+# Sleep Patterns (page_aleya_nazifa)
+# ============================================================
+def nazifa_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    return prepare_nazifa_data(raw, NAZIFA_PAGE_FEATURES)
+
+
+def risk_counts(df: pd.DataFrame) -> dict:
+    """Respondent counts behind the key metrics."""
+    # Metric A: Short sleepers
+    short_n = int(df["SleepDurationCategory"].astype(str).eq("Short (<6h)").sum()) if "SleepDurationCategory" in df.columns else 0
+
+    # Metric B: Late bedtime (After 12 AM)
+    late_n = int(df["LateBedtime"].sum()) if "LateBedtime" in df.columns else 0
+
+    # Metric C: Poor sleep quality (1–2)
+    poor_quality_n = int(df["SleepQuality_num"].isin([1, 2]).sum()) if "SleepQuality_num" in df.columns else 0
+
+    # Metric D: Co-occurring frequent symptoms
+    both_n = 0
+    if {"FrequentDifficultyFallingAsleep", "FrequentNightWakeups"}.issubset(df.columns):
+        both_n = int((df["FrequentDifficultyFallingAsleep"] & df["FrequentNightWakeups"]).sum())
+
+    return {"short_n": short_n, "late_n": late_n, "poor_quality_n": poor_quality_n, "both_n": both_n}
+
+
+def nazifa_metrics(df: pd.DataFrame) -> dict:
+    """risk_counts() plus each count in % of respondents (`<name>_pct`)."""
+    def compute():
+        counts = risk_counts(df)
+        return {**counts, **{f"{k[:-2]}_pct": pct(n, len(df)) for k, n in counts.items()}}
+
+    return page_cached(df, "nazifa", "metrics", compute)
+
+
+def sleep_categories(df: pd.DataFrame) -> pd.DataFrame:
+    return page_cached(df, "nazifa", "sleep_categories", lambda: (
+        get_cube(df).counts("SleepDurationCategory")
+        .reindex(SLEEP_CAT_ORDER, fill_value=0)
+        .rename_axis("Category").reset_index(name="Count")
+    ))
+
+
+def symptom_crosstab(df: pd.DataFrame) -> pd.DataFrame:
+    def compute():
+        heat = get_cube(df).counts("DifficultyFallingAsleep", "NightWakeups")
+        # observed answers only, as pd.crosstab
+        return heat.loc[heat.sum(axis=1) > 0, heat.sum(axis=0) > 0]
+
+    return page_cached(df, "nazifa", "symptom_crosstab", compute)
+
+
+def sleep_hours_figure(df: pd.DataFrame):
+    fig = histogram_figure(
+        df,
+        x="SleepHours_est",
+        nbins=8,
+        title="Sleep Duration Distribution",
+        colors=SUNSET
+    )
+    fig.update_layout(
+        xaxis_title="Hours of Sleep (Estimated)",
+        yaxis_title="Number of Students",
+        showlegend=False
+    )
+    return fig
+
+
+def sleep_category_figure(df: pd.DataFrame):
+    fig = px.bar(
+        sleep_categories(df),
+        x="Category",
+        y="Count",
+        text="Count",
+        title="Sleep Duration Category Distribution",
+        category_orders={"Category": SLEEP_CAT_ORDER},
+        color_discrete_sequence=SUNSET
+    )
+    fig.update_traces(textposition="outside", cliponaxis=False)
+    fig.update_layout(
+        xaxis_title="Sleep Duration Category",
+        yaxis_title="Number of Students",
+        showlegend=False
+    )
+    return fig
+
+
+def bedtime_figure(df: pd.DataFrame):
+    # BedTime is categorical in BEDTIME_ORDER: one slice per bedtime, in order
+    counts = _present(get_cube(df).counts("BedTime")).rename_axis("BedTime").reset_index(name="Count")
+    fig = px.pie(
+        counts,
+        names="BedTime",
+        values="Count",
+        hole=0.45,
+        title="Bedtime Distribution (Weekdays)",
+        color_discrete_sequence=SUNSET
+    )
+    fig.update_layout(showlegend=True)
+    return fig
+
+
+def quality_by_bedtime_figure(df: pd.DataFrame):
+    # BedTime_order is BedTime cast to BEDTIME_ORDER (see cleaning_nazifa)
+    fig = violin_figure(
+        df,
+        x="BedTime_order",
+        y="SleepQuality_num",
+        box=True,
+        points=False,
+        title="Sleep Quality Across Bedtime Categories",
+        order=BEDTIME_ORDER,
+        colors=SUNSET[:1]
+    )
+    fig.update_layout(
+        xaxis_title="Bedtime Category",
+        yaxis_title="Sleep Quality (1=Poor, 5=Excellent)",
+        showlegend=False
+    )
+    return fig
+
+
+def symptom_figure(df: pd.DataFrame):
+    fig = px.imshow(
+        symptom_crosstab(df),
+        text_auto=True,
+        title="Difficulty Falling Asleep vs Night Wakeups",
+        color_continuous_scale=SUNSET
+    )
+    fig.update_layout(
+        xaxis_title="Night Wakeups Frequency",
+        yaxis_title="Difficulty Falling Asleep Frequency"
+    )
+    return fig
+
+
+# ============================================================
+# Academic Impact (page_aleya_aelyana)
+# ============================================================
+def aelyana_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    return prepare_aelyana_data(raw, AELYANA_PAGE_FEATURES)
+
+
+def severe_metrics(df: pd.DataFrame) -> dict:
+    """Key findings for the severe insomnia group."""
+    def compute():
+        severe = df[df["Insomnia_Category"] == "Severe Insomnia"] if "Insomnia_Category" in df.columns else df
+        stats = running_stats(df, "academic_impact")
+        group = "Severe Insomnia" if "Insomnia_Category" in df.columns else None
+
+        focus_risk = (
+            stats.mean("focus_risk", group) * 100
+            if "ConcentrationDifficulty" in severe.columns
+            else 0.0
+        )
+        fatigue_risk = (
+            stats.mean("fatigue_risk", group) * 100
+            if "DaytimeFatigue" in severe.columns
+            else 0.0
+        )
+        perf_level = safe_mode(severe["AcademicPerformance"]) if "AcademicPerformance" in severe.columns else "N/A"
+        assign_risk = (
+            stats.mean("assign_risk", group) * 100
+            if "AssignmentImpact" in severe.columns
+            else 0.0
+        )
+        return {"focus_risk": focus_risk, "fatigue_risk": fatigue_risk, "perf_level": perf_level, "assign_risk": assign_risk}
+
+    return page_cached(df, "aelyana", "severe_metrics", compute)
+
+
+def by_category(df: pd.DataFrame, column: str, value_name: str = "Count") -> pd.DataFrame:
+    """Respondents per (Insomnia_Category, answer of `column`), long format."""
+    return page_cached(df, "aelyana", f"{column}_by_category", lambda: (
+        get_cube(df).counts("Insomnia_Category", column).reset_index().melt(
+            id_vars="Insomnia_Category",
+            var_name=column,
+            value_name=value_name,
+        )
+    ))
+
+
+def gpa_order(df: pd.DataFrame) -> list:
+    return page_cached(df, "aelyana", "gpa_order", lambda: sorted(df["GPA"].dropna().unique().tolist()))
+
+
+def corr_columns(df: pd.DataFrame) -> list:
+    """CORR_COLUMNS present in `df`."""
+    return [c for c in CORR_COLUMNS if c in df.columns]
+
+
+def corr_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    return page_cached(
+        df, "aelyana", "corr_matrix",
+        lambda: running_stats(df, "academic_corr").corr_matrix(corr_columns(df)),
+    )
+
+
+def concentration_figure(df: pd.DataFrame):
+    return px.bar(
+        by_category(df, "ConcentrationDifficulty"),
+        x="Insomnia_Category",
+        y="Count",
+        color="ConcentrationDifficulty",
+        barmode="group",
+        title="Concentration Difficulty by Insomnia Category",
+        category_orders={"Insomnia_Category": INSOMNIA_ORDER, "ConcentrationDifficulty": FREQ_ORDER},
+        color_discrete_sequence=px.colors.sequential.Sunset,
+        labels={"Count": "Number of Students", "Insomnia_Category": "Insomnia Level"},
+    )
+
+
+def gpa_isi_figure(df: pd.DataFrame):
+    fig = box_figure(
+        df,
+        x="GPA",
+        y="InsomniaSeverity_index",
+        title="Insomnia Severity Index Across GPA Categories",
+        order=gpa_order(df),
+        colors=px.colors.sequential.Sunset,
+        points="outliers",
+    )
+    fig.update_layout(showlegend=False, plot_bgcolor="rgba(0,0,0,0)")
+    return fig
+
+
+def assignment_figure(df: pd.DataFrame):
+    return px.bar(
+        by_category(df, "AssignmentImpact", "Student_Count"),
+        x="Insomnia_Category",
+        y="Student_Count",
+        color="AssignmentImpact",
+        title="Assignment Impact by Insomnia Category",
+        category_orders={"Insomnia_Category": INSOMNIA_ORDER, "AssignmentImpact": IMPACT_ORDER},
+        color_discrete_sequence=px.colors.sequential.Sunset,
+        barmode="stack",
+        labels={"Student_Count": "Number of Students"},
+    )
+
+
+def fatigue_figure(df: pd.DataFrame):
+    return px.bar(
+        by_category(df, "DaytimeFatigue"),
+        x="Insomnia_Category",
+        y="Count",
+        color="DaytimeFatigue",
+        title="Fatigue Level by Insomnia Severity",
+        category_orders={"Insomnia_Category": INSOMNIA_ORDER, "DaytimeFatigue": FREQ_ORDER},
+        color_discrete_sequence=px.colors.sequential.Sunset,
+        barmode="stack",
+    )
+
+
+def performance_figure(df: pd.DataFrame):
+    fig = box_figure(
+        df,
+        x="Insomnia_Category",
+        y="AcademicPerformance",
+        title="Academic Performance by Insomnia Category",
+        order=INSOMNIA_ORDER,
+        y_order=ACADEMIC_ORDER,
+        colors=px.colors.sequential.Sunset,
+        points="outliers",
+    )
+    fig.update_layout(showlegend=False, yaxis=dict(autorange="reversed"))
+    return fig
+
+
+def correlation_figure(df: pd.DataFrame):
+    fig = px.imshow(
+        corr_matrix(df),
+        text_auto=".2f",
+        aspect="auto",
+        color_continuous_scale='SUNSET',
+        zmin=-1,
+        zmax=1,
+        title="Correlation Heatmap: Sleep Issues vs. Academic Outcomes"
+    )
+    fig.update_layout(
+        height=600,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        title_font_size=18
+    )
+    #fig.update_xaxes(tickangle=45)
+    return fig
+
+
+# ============================================================
+# Registry
+# ============================================================
+# page -> how its frame is derived from the loader frame and its metrics
+PAGES = {
+    "home": {"frame": None, "metrics": home_metrics},
+    "nash": {"frame": None, "metrics": nash_metrics},
+    "nazifa": {"frame": nazifa_frame, "metrics": nazifa_metrics},
+    "aelyana": {"frame": aelyana_frame, "metrics": severe_metrics},
+}
+
+# figure id ("<page>/<id>") -> when the page shows it, the aggregate
+# tables it is drawn from, and its builder
+FIGURES = {
+    "home/o1": {"available": _has("InsomniaSeverity_index"), "tables": {}, "build": isi_figure},
+    "home/o2": {"available": _has("Faculty"), "tables": {"faculty_counts": faculty_counts}, "build": faculty_figure},
+    "nash/c1": {"available": _has("DeviceUsage"), "tables": {"device_counts": device_counts}, "build": device_usage_figure},
+    "nash/c2": {"available": _has("DeviceUsage", "InsomniaSeverity_index"), "tables": {}, "build": device_isi_figure},
+    "nash/c3": {"available": _has("CaffeineConsumption", "InsomniaSeverity_index"), "tables": {}, "build": caffeine_isi_figure},
+    "nash/c4": {"available": _has("StressLevel", "InsomniaSeverity_index"), "tables": {}, "build": stress_isi_figure},
+    "nash/c5": {"available": _has("Lifestyle_Risk", "InsomniaSeverity_index"), "tables": {}, "build": lifestyle_risk_figure},
+    "nazifa/a1": {"available": _has("SleepHours_est"), "tables": {}, "build": sleep_hours_figure},
+    "nazifa/a2": {
+        "available": _has("SleepDurationCategory"),
+        "tables": {"sleep_categories": sleep_categories},
+        "build": sleep_category_figure,
+    },
+    "nazifa/a3": {"available": _has("BedTime"), "tables": {}, "build": bedtime_figure},
+    "nazifa/a4": {
+        "available": _has("BedTime", "BedTime_order", "SleepQuality_num"),
+        "tables": {},
+        "build": quality_by_bedtime_figure,
+    },
+    "nazifa/a5": {
+        "available": _has("DifficultyFallingAsleep", "NightWakeups"),
+        "tables": {"symptom_crosstab": symptom_crosstab},
+        "build": symptom_figure,
+    },
+    "aelyana/a": {
+        "available": _has("Insomnia_Category", "ConcentrationDifficulty"),
+        "tables": {"concentration_by_category": lambda df: by_category(df, "ConcentrationDifficulty")},
+        "build": concentration_figure,
+    },
+    "aelyana/b": {"available": _has("GPA", "InsomniaSeverity_index"), "tables": {}, "build": gpa_isi_figure},
+    "aelyana/c": {
+        "available": _has("Insomnia_Category", "AssignmentImpact"),
+        "tables": {"assignment_by_category": lambda df: by_category(df, "AssignmentImpact", "Student_Count")},
+        "build": assignment_figure,
+    },
+    "aelyana/d": {
+        "available": _has("Insomnia_Category", "DaytimeFatigue"),
+        "tables": {"fatigue_by_category": lambda df: by_category(df, "DaytimeFatigue")},
+        "build": fatigue_figure,
+    },
+    "aelyana/e": {
+        "available": _has("Insomnia_Category", "AcademicPerformance"),
+        "tables": {},
+        "build": performance_figure,
+    },
+    "aelyana/f": {
+        "available": lambda df: len(corr_columns(df)) >= 2,
+        "tables": {"corr_matrix": corr_matrix},
+        "build": correlation_figure,
+    },
+}
+
+
+def page_frame(df: pd.DataFrame, page: str) -> pd.DataFrame:
+    """The frame `page` renders, from the loader frame `df`."""
+    frame = PAGES[page]["frame"]
+    return frame(df) if frame is not None else df
+
+
+def has_figure(df: pd.DataFrame, figure_id: str) -> bool:
+    return FIGURES[figure_id]["available"](df)
+
+
+def page_figure(df: pd.DataFrame, figure_id: str):
+    """FIGURES[figure_id] over the page frame `df`, cached per data version."""
+    return cached_figure(df, figure_id, lambda: FIGURES[figure_id]["build"](df))
+
+
+def compute_page(df: pd.DataFrame, page: str) -> dict:
+    """
+    Everything `page` shows for the loader frame `df`: {"rows", "metrics",
+    "tables": {name: DataFrame}, "figures": {figure id: go.Figure}}.
+    Figures whose columns are missing are left out, as on the page.
+    """
+    pdf = page_frame(df, page)
+    if pdf is None or len(pdf) == 0:
+        return {"rows": 0, "metrics": {}, "tables": {}, "figures": {}}
+
+    tables, figures = {}, {}
+    for figure_id, spec in FIGURES.items():
+        if not figure_id.startswith(page + "/") or not spec["available"](pdf):
+            continue
+        for name, table in spec["tables"].items():
+            tables[name] = table(pdf)
+        figures[figure_id] = page_figure(pdf, figure_id)
+
+    return {
+        "rows": len(pdf),
+        "metrics": PAGES[page]["metrics"](pdf),
+        "tables": tables,
+        "figures": figures,
+    }
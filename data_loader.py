@@ -1,229 +1,229 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
-
-# ============================================================
-# Google Sheets (Published CSV)
-# ============================================================
-GOOGLE_SHEETS_URL = (
-    "https://docs.google.com/spreadsheets/d/e/"
-    "2PACX-1vSf4umx6QNDel99If8P2otizAHj7jEDxFIsqandbD0zYVzfDheZo2YVkK1_zknpDKjHnBuYWCINgcCe"
-    "/pub?output=csv"
-)
-
-# ============================================================
-# Helpers: Column normalization
-# ============================================================
-def _norm_header(s: str) -> str:
-    """
-    Normalize Google Form headers:
-    - remove trailing / repeated spaces
-    - remove newlines / tabs
-    - handle non-breaking spaces
-    """
-    s = str(s).replace("\u00A0", " ")
-    s = s.replace("\n", " ").replace("\t", " ")
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-
-def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df.columns = [_norm_header(c) for c in df.columns]
-    return df
+import threading
+import time
 
+from filters import DATE_COLUMN, FILTER_COLUMNS, filtered_view, get_index
+from ingest import GOOGLE_SHEETS_URL, ingest_sheet, warm_start
+from running_stats import running_stats
 
 # ============================================================
-# Helpers: Feature engineering (shared, light)
+# Background refresher (stale-while-revalidate)
 # ============================================================
-def _sleep_hours_to_estimate(x) -> float:
-    if pd.isna(x):
-        return np.nan
-
-    s = str(x).strip().lower().replace("–", "-")
-
-    if "more than" in s:
-        nums = re.findall(r"\d+", s)
-        return float(nums[0]) + 0.5 if nums else np.nan
-
-    if "less than" in s:
-        nums = re.findall(r"\d+", s)
-        return float(nums[0]) - 0.5 if nums else np.nan
-
-    nums = re.findall(r"\d+", s)
-    if len(nums) >= 2:
-        return (float(nums[0]) + float(nums[1])) / 2
-    if len(nums) == 1:
-        return float(nums[0])
-
-    return np.nan
-
-
-def _map_frequency_to_score(x) -> int:
-    mapping = {
-        "Never": 0,
-        "Rarely (1–2 times a week)": 1,
-        "Rarely (1-2 times a week)": 1,
-        "Sometimes (3–4 times a week)": 2,
-        "Sometimes (3-4 times a week)": 2,
-        "Often (5–6 times a week)": 3,
-        "Often (5-6 times a week)": 3,
-        "Always (every night)": 4,
-    }
-    return mapping.get(str(x).strip(), 0)
+REFRESH_INTERVAL = 300  # seconds between background re-fetches
 
 
-def _calculate_isi(df: pd.DataFrame) -> pd.Series:
+class _Refresher:
     """
-    Simple ISI-like score (0–28):
-    - Difficulty falling asleep
-    - Night wakeups
-    - Inverted sleep quality
+    Serves the last good frame and rebuilds the next one on a worker thread.
+    Only the very first load of a process (no snapshot on disk) blocks.
     """
-    diff = df["DifficultyFallingAsleep"].astype(str).map(_map_frequency_to_score).fillna(0)
-    wake = df["NightWakeups"].astype(str).map(_map_frequency_to_score).fillna(0)
-
-    q = pd.to_numeric(df["SleepQuality"], errors="coerce")
-    quality_risk = (5 - q).clip(lower=0, upper=4).fillna(0)
 
-    raw = diff + wake + quality_risk  # 0–12
-    return (raw / 12 * 28).round(1)
-
-
-def _calculate_lifestyle_risk(df: pd.DataFrame) -> pd.Series:
-    def row_risk(row):
-        risk = 0
-
-        if "Always" in str(row.get("DeviceUsage", "")):
-            risk += 3
-        elif "Often" in str(row.get("DeviceUsage", "")):
-            risk += 2
-
-        if "Always" in str(row.get("CaffeineConsumption", "")):
-            risk += 3
-        elif "Often" in str(row.get("CaffeineConsumption", "")):
-            risk += 2
-
-        if any(x in str(row.get("PhysicalActivity", "")) for x in ["Never", "Rarely"]):
-            risk += 2
-
-        if "Extremely" in str(row.get("StressLevel", "")):
-            risk += 3
-        elif "High" in str(row.get("StressLevel", "")):
-            risk += 2
-
-        return risk
-
-    return df.apply(row_risk, axis=1)
+    def __init__(self, url: str):
+        self.url = url
+        self.frame = None
+        self.version = 0
+        self.as_of = None       # when the served frame was built
+        self.checked_at = None  # last completed fetch (changed or not)
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def get(self) -> pd.DataFrame:
+        if self.frame is None:
+            with self._lock:
+                if self.frame is None:
+                    self._load_initial()
+        if time.time() - self.checked_at > REFRESH_INTERVAL:
+            self.refresh()
+        return self.frame
+
+    def refresh(self) -> None:
+        """Start a background rebuild unless one is already running."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="sheet-refresh", daemon=True)
+            self._worker.start()
+
+    def refreshing(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def _load_initial(self) -> None:
+        snapshot = warm_start(self.url)
+        if snapshot is not None:
+            # Snapshot is served right away; mark it due so get() revalidates it
+            self._swap(snapshot)
+            self.checked_at = 0
+        else:
+            self._swap(ingest_sheet(self.url))
+
+    def _run(self) -> None:
+        try:
+            df = ingest_sheet(self.url)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.checked_at = time.time()
+            return
+        self._swap(df)
+
+    def _swap(self, df: pd.DataFrame) -> None:
+        now = time.time()
+        if df is not self.frame:
+            get_index(df)  # sidebar filters resolve against it from the first rerun
+            # single reference assignment: readers see the old or new frame, never a mix
+            self.frame = df
+            self.version += 1
+            self.as_of = now
+        self.checked_at = now
+        self.last_error = None
+
+    def status(self) -> dict:
+        return {
+            "version": self.version,
+            "as_of": self.as_of,
+            "age": time.time() - self.as_of if self.as_of else None,
+            "refreshing": self.refreshing(),
+            "last_error": self.last_error,
+        }
+
+
+@st.cache_resource
+def _get_refresher(url: str) -> _Refresher:
+    return _Refresher(url)
 
 
 # ============================================================
 # Main loader (AUTO-REFRESH)
 # ============================================================
-@st.cache_data(ttl=300)
 def load_data() -> pd.DataFrame:
-    df = pd.read_csv(GOOGLE_SHEETS_URL)
-    df = _clean_columns(df)
-
-    # ---------- Robust rename ----------
-    col_map = {
-        "Timestamp": "Timestamp",
-        "What is your gender?": "Gender",
-        "What is your age group?": "AgeGroup",
-        "What is your year of study?": "YearOfStudy",
-        "Which faculty are you currently enrolled in?": "Faculty",
-        "How often do you have difficulty falling asleep at night?": "DifficultyFallingAsleep",
-        "On average, how many hours of sleep do you get on a typical day?": "SleepHours",
-        "How often do you wake up during the night and have trouble falling back asleep?": "NightWakeups",
-        "How would you rate the overall quality of your sleep?": "SleepQuality",
-        "At what time do you usually go to bed on weekdays?": "BedTime",
-        "Do you usually nap during the day?": "DayNap",
-        "How often do you experience difficulty concentrating during lectures or studying due to lack of sleep?": "ConcentrationDifficulty",
-        "How often do you feel fatigued during the day, affecting your ability to study or attend classes?": "DaytimeFatigue",
-        "How often do you miss or skip classes due to sleep-related issues (e.g., insomnia, feeling tired)?": "MissedClasses",
-        "How would you describe the impact of insufficient sleep on your ability to complete assignments and meet deadlines?": "AssignmentImpact",
-        "During exam periods, how much does your sleep pattern change?": "ExamSleepChange",
-        "How would you rate your overall academic performance (GPA or grades) in the past semester?": "AcademicPerformance",
-        "What is your GPA range for the most recent semester?": "GPA",
-        "What is your CGPA range for the most recent semester?": "CGPA",
-        "How often do you use electronic devices (e.g., phone, computer) before going to sleep?": "DeviceUsage",
-        "How often do you consume caffeine (coffee, energy drinks) to stay awake or alert?": "CaffeineConsumption",
-        "How often do you engage in physical activity or exercise?": "PhysicalActivity",
-        "How would you describe your stress levels related to academic workload?": "StressLevel",
-        "Do you use any methods to help you sleep?": "SleepMethods",
-    }
+    """Current frame; returns immediately once a first frame exists."""
+    return _get_refresher(GOOGLE_SHEETS_URL).get()
 
-    col_map_norm = {_norm_header(k): v for k, v in col_map.items()}
-    df = df.rename(columns={c: col_map_norm[c] for c in df.columns if c in col_map_norm})
 
-    # ---------- Timestamp ----------
-    if "Timestamp" in df.columns:
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-
-    # ---------- Shared derived columns ----------
-    if "SleepHours" in df.columns:
-        df["SleepHours_est"] = df["SleepHours"].map(_sleep_hours_to_estimate)
-
-    if {"DifficultyFallingAsleep", "NightWakeups", "SleepQuality"}.issubset(df.columns):
-        df["InsomniaSeverity_index"] = _calculate_isi(df)
-    else:
-        df["InsomniaSeverity_index"] = np.nan
+def data_status() -> dict:
+    return _get_refresher(GOOGLE_SHEETS_URL).status()
 
-    if {"DeviceUsage", "CaffeineConsumption", "PhysicalActivity", "StressLevel"}.issubset(df.columns):
-        df["Lifestyle_Risk"] = _calculate_lifestyle_risk(df)
-    else:
-        df["Lifestyle_Risk"] = 0
 
-    return df
+def refresh_data() -> None:
+    _get_refresher(GOOGLE_SHEETS_URL).refresh()
 
 
 # ============================================================
 # Sidebar helpers
 # ============================================================
+NO_MATCHES = "No responses match the current filters."
+
+
 def get_data_info(df: pd.DataFrame) -> dict:
     return {
         "total_responses": len(df),
         "last_updated": df["Timestamp"].max() if "Timestamp" in df.columns else None,
         "faculties": df["Faculty"].nunique() if "Faculty" in df.columns else 0,
-        "avg_isi": pd.to_numeric(df["InsomniaSeverity_index"], errors="coerce").mean(),
+        "avg_isi": running_stats(df, "overall").mean("isi"),
     }
 
 
-def display_sidebar_info():
-    st.sidebar.markdown("### 📊 Data Status")
+def display_filters(df: pd.DataFrame) -> dict:
+    """
+    Sidebar filter widgets over `df`. The selection is kept in
+    st.session_state["filters"], so it follows the user across pages.
+    """
+    index = get_index(df)
+    saved = st.session_state.get("filters", {})
+    filters = {}
+
+    st.sidebar.markdown("### 🔎 Filters")
+    for col, label in FILTER_COLUMNS.items():
+        options = index.labels.get(col)
+        if options:
+            default = [a for a in saved.get(col, []) if a in options]
+            filters[col] = st.sidebar.multiselect(label, options, default=default, key=f"filter_{col}")
+
+    bounds = index.date_bounds()
+    if bounds is not None:
+        start, end = saved.get(DATE_COLUMN, bounds)
+        start, end = min(max(start, bounds[0]), bounds[1]), max(min(end, bounds[1]), bounds[0])
+        picked = st.sidebar.date_input(
+            "Response date", value=(start, end), min_value=bounds[0], max_value=bounds[1], key="filter_date"
+        )
+        # a range is (start,) while its end is still being picked
+        if len(picked) == 2 and tuple(picked) != bounds:
+            filters[DATE_COLUMN] = tuple(picked)
 
-    if "data" not in st.session_state or st.session_state.data is None:
-        st.session_state.data = load_data()
+    st.session_state["filters"] = filters
+    return filters
 
-    df = st.session_state.data
-    if df is None or len(df) == 0:
-        st.sidebar.error("❌ Failed to load data")
-        return
 
+@st.fragment
+def _status_panel(df: pd.DataFrame, full_rows: int) -> None:
+    """
+    Data status and the refresh button. A fragment: "Refresh Now" only
+    reruns this panel, not the page (the refresh itself runs in the
+    background and the next rerun picks up the new frame).
+    """
     info = get_data_info(df)
+    status = data_status()
 
-    st.sidebar.success("✅ Data Loaded")
-    st.sidebar.metric("Total Responses", info["total_responses"])
+    st.success("✅ Data Loaded")
+    st.metric("Total Responses", info["total_responses"])
+    if len(df) != full_rows:
+        st.caption(f"Filtered: {len(df):,} of {full_rows:,} responses")
+
+    if len(df) == 0:
+        st.warning(NO_MATCHES)
+    else:
+        # NaT when no row has a parseable timestamp
+        if info["last_updated"] is not None and pd.notna(info["last_updated"]):
+            st.metric(
+                "Last Updated",
+                info["last_updated"].strftime("%Y-%m-%d %H:%M")
+            )
+
+        st.metric("Faculties", info["faculties"])
+        if not np.isnan(info["avg_isi"]):
+            st.metric("Avg ISI", f"{info['avg_isi']:.1f}")
+
+    if status["as_of"] is not None:
+        as_of = pd.Timestamp.fromtimestamp(status["as_of"]).strftime("%Y-%m-%d %H:%M:%S")
+        st.caption(f"🕒 Data as of {as_of} (v{status['version']})")
+    if status["refreshing"]:
+        st.caption("⏳ Refreshing in background…")
+    if status["last_error"]:
+        st.warning(f"Last refresh failed, showing previous data. {status['last_error']}")
+
+    st.caption("🔄 Auto-refresh every 5 minutes")
+
+    if st.button("🔄 Refresh Now", use_container_width=True):
+        refresh_data()
+        st.toast("Refreshing data in the background…")
 
-    if info["last_updated"] is not None:
-        st.sidebar.metric(
-            "Last Updated",
-            info["last_updated"].strftime("%Y-%m-%d %H:%M")
-        )
 
-    st.sidebar.metric("Faculties", info["faculties"])
-    if not np.isnan(info["avg_isi"]):
-        st.sidebar.metric("Avg ISI", f"{info['avg_isi']:.1f}")
+def display_sidebar_info():
+    st.sidebar.markdown("### 📊 Data Status")
+    status_box = st.sidebar.container()
+
+    full = load_data()
+    if full is None or len(full) == 0:
+        status_box.error("❌ Failed to load data")
+        return
+
+    display_filters(full)
+    with status_box:
+        _status_panel(get_df(), len(full))
 
-    st.sidebar.caption("🔄 Auto-refresh every 5 minutes")
 
-    if st.sidebar.button("🔄 Refresh Now", use_container_width=True):
-        st.cache_data.clear()
-        st.session_state.data = load_data()
-        st.rerun()
+def show_no_data() -> None:
+    """Why a page has nothing to show: the load failed, or the filters match no responses."""
+    data = st.session_state.get("data")
+    if data is None or len(data) == 0:
+        st.error("No data available.")
+    else:
+        st.info(NO_MATCHES)
 
 
 def get_df() -> pd.DataFrame:
-    if "data" not in st.session_state or st.session_state.data is None:
-        st.session_state.data = load_data()
-    return st.session_state.data
+    """The loaded frame, narrowed to the sidebar filters."""
+    st.session_state.data = load_data()
+    return filtered_view(st.session_state.data, st.session_state.get("filters"))
@@ -0,0 +1,112 @@
+import gzip
+import io
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # only the CSV formats are offered without pyarrow
+    pa = feather = pq = None
+
+from cleaning_aelyana import AELYANA_ALIASES, AELYANA_FEATURES
+from cleaning_nazifa import NAZIFA_FEATURES
+from features import with_features
+from frame_cache import VersionedCache, frame_version
+
+
+# ============================================================
+# Exported columns
+# ============================================================
+# The loader frame plus the engineered columns of the Sleep Patterns and
+# Academic Impact pages. The Academic Impact variants that replace a
+# shared column on that page (see AELYANA_ALIASES) are exported under
+# their own names, next to the column they replace.
+EXPORT_FEATURES = list(dict.fromkeys(
+    NAZIFA_FEATURES + [AELYANA_ALIASES.get(f, f) for f in AELYANA_FEATURES]
+))
+
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` with EXPORT_FEATURES added (cached per data version, read-only)."""
+    return with_features(df, EXPORT_FEATURES)
+
+
+# ============================================================
+# Writers
+# ============================================================
+CSV_CHUNK_ROWS = 10_000
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows: int = CSV_CHUNK_ROWS):
+    """UTF-8 CSV of `df` in chunks of `chunk_rows` rows, header first."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def _write_csv(df: pd.DataFrame, buf) -> None:
+    for chunk in iter_csv(df):
+        buf.write(chunk)
+
+
+def _write_csv_gz(df: pd.DataFrame, buf) -> None:
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6, mtime=0) as gz:
+        _write_csv(df, gz)
+
+
+def _write_parquet(df: pd.DataFrame, buf) -> None:
+    pq.write_table(arrow_table(df), buf, compression="zstd")
+
+
+def _write_feather(df: pd.DataFrame, buf) -> None:
+    feather.write_feather(arrow_table(df), buf, compression="lz4")
+
+
+# format -> download spec; Parquet and Feather need pyarrow
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "extension": "csv", "mime": "text/csv", "write": _write_csv},
+    "csv.gz": {"label": "CSV (gzip)", "extension": "csv.gz", "mime": "application/gzip", "write": _write_csv_gz},
+}
+if pa is not None:
+    EXPORT_FORMATS["parquet"] = {
+        "label": "Parquet", "extension": "parquet",
+        "mime": "application/vnd.apache.parquet", "write": _write_parquet,
+    }
+    EXPORT_FORMATS["feather"] = {
+        "label": "Arrow IPC / Feather", "extension": "arrow",
+        "mime": "application/vnd.apache.arrow.file", "write": _write_feather,
+    }
+
+
+# ============================================================
+# Cached exports
+# ============================================================
+# Built when a download is requested (not on every rerun), once per data
+# version and format: filtered views have their own version, so each
+# slice is exported once however many sessions download it.
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_EXPORTS = VersionedCache(max_entries=32, max_bytes=EXPORT_CACHE_MAX_BYTES, name="exports")
+
+
+def arrow_table(df: pd.DataFrame):
+    """
+    `df` as an Arrow table, shared by the Parquet and Feather writers.
+    Numeric and Arrow-backed string columns are wrapped without copying.
+    """
+    return _EXPORTS.get_or_compute(
+        "arrow", frame_version(df), lambda: pa.Table.from_pandas(df, preserve_index=False)
+    )
+
+
+def export_bytes(df: pd.DataFrame, fmt: str = "csv") -> bytes:
+    """export_frame(df) written in format `fmt` (a key of EXPORT_FORMATS)."""
+    spec = EXPORT_FORMATS[fmt]
+
+    def compute():
+        buf = io.BytesIO()
+        spec["write"](export_frame(df), buf)
+        return buf.getvalue()
+
+    return _EXPORTS.get_or_compute(f"export:{fmt}", frame_version(df), compute)
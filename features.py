@@ -0,0 +1,206 @@
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+from frame_cache import VersionedCache, frame_version
+from parsing import answer_codes, answers_contain, map_answers, sleep_hours_estimate
+from scoring import categorize, compute_indexes
+
+
+# ============================================================
+# Feature registry
+# ============================================================
+# Every derived column is declared once with the columns it reads and a
+# vectorized builder. Pages ask for the columns they render; the engine
+# walks the inputs (base columns first, then other features), builds only
+# what is missing and memoizes each feature per data version, so the same
+# feature is shared by every page that asks for it.
+_REGISTRY: dict = {}
+
+_FEATURES = VersionedCache(max_entries=512, name="features")
+_VIEWS = VersionedCache(max_entries=64, name="feature_views")
+
+
+def feature(*outputs, inputs=()):
+    """
+    Register a builder for one or more derived columns.
+
+    The builder gets `(cols, index)`: `cols` maps each input name to its
+    Series (None when unavailable). It returns the column (single output)
+    or a dict of columns; None/missing entries are left out of the frame.
+    """
+    def register(build):
+        spec = {"outputs": tuple(outputs), "inputs": tuple(inputs), "build": build}
+        for name in outputs:
+            _REGISTRY[name] = spec
+        return build
+    return register
+
+
+def _build(df: pd.DataFrame, spec: dict, version, memo: dict) -> dict:
+    cols = {name: _resolve(df, name, version, memo) for name in spec["inputs"]}
+    result = spec["build"](cols, df.index)
+    if not isinstance(result, dict):
+        result = {spec["outputs"][0]: result}
+
+    out = {}
+    for name, values in result.items():
+        if values is None:
+            continue
+        if not isinstance(values, pd.Series):
+            values = pd.Series(values, index=df.index)
+        out[name] = values.rename(name)
+    return out
+
+
+def _resolve(df: pd.DataFrame, name: str, version, memo: dict):
+    """Base column if present, else the registered feature, else None."""
+    if name in df.columns:
+        return df[name]
+    spec = _REGISTRY.get(name)
+    if spec is None:
+        return None
+
+    key = spec["outputs"]
+    if key not in memo:
+        if version is None:
+            memo[key] = _build(df, spec, None, memo)
+        else:
+            memo[key] = _FEATURES.get_or_compute(
+                f"feature:{key[0]}", version, lambda: _build(df, spec, version, memo)
+            )
+    return memo[key].get(name)
+
+
+def compute_features(df: pd.DataFrame, names) -> dict:
+    """Requested features as {name: Series}, without memoization."""
+    memo = {}
+    out = {}
+    for name in names:
+        values = _resolve(df, name, None, memo)
+        if values is not None:
+            out[name] = values
+    return out
+
+
+def with_features(df: pd.DataFrame, names, aliases=None) -> pd.DataFrame:
+    """
+    Shallow copy of `df` with the requested features added.
+
+    `aliases` maps an output column to the feature that fills it, for
+    pages whose variant of a column replaces the shared one (e.g. the
+    Academic Impact ISI). Features that cannot be built are left out.
+    The result is cached per data version: treat it as read-only.
+    """
+    if df is None or len(df) == 0:
+        return df
+
+    names = tuple(names)
+    aliases = dict(aliases or {})
+    version = frame_version(df)
+    key = (names, tuple(sorted(aliases.items())))
+
+    def compute():
+        memo = {}
+        out = df.copy(deep=False)
+        for name in names:
+            values = _resolve(df, aliases.get(name, name), version, memo)
+            if values is not None:
+                out[name] = values.rename(name)
+        suffix = "/features:" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8]
+        out.attrs["data_version"] = version + suffix
+        # same rows as `df`, so an appended frame's view extends the parent's view
+        if df.attrs.get("parent_version"):
+            out.attrs["parent_version"] = df.attrs["parent_version"] + suffix
+        return out
+
+    return _VIEWS.get_or_compute("with_features", version, compute, key=key)
+
+
+# ============================================================
+# Shared features
+# ============================================================
+@feature("SleepHours_est", inputs=("SleepHours",))
+def _sleep_hours_est(cols, index):
+    if cols["SleepHours"] is None:
+        return np.full(len(index), np.nan)
+    return map_answers(cols["SleepHours"], sleep_hours_estimate)
+
+
+@feature("InsomniaSeverity_index", inputs=("DifficultyFallingAsleep", "NightWakeups", "SleepQuality"))
+def _insomnia_severity(cols, index):
+    # NaN unless all ISI components are present (see scoring.INDEX_SPECS["isi"])
+    present = pd.DataFrame({c: s for c, s in cols.items() if s is not None}, index=index)
+    return compute_indexes(present, ["isi"])["InsomniaSeverity_index"]
+
+
+@feature("ISI_Category", inputs=("InsomniaSeverity_index",))
+def _isi_category(cols, index):
+    return pd.Series(categorize(cols["InsomniaSeverity_index"], "isi"), index=index)
+
+
+# Lifestyle risk rules: (column, tiers). Tiers are checked in order and the
+# first one whose keywords occur in the answer scores its points.
+LIFESTYLE_RISK_RULES = [
+    ("DeviceUsage", [(("Always",), 3), (("Often",), 2)]),
+    ("CaffeineConsumption", [(("Always",), 3), (("Often",), 2)]),
+    ("PhysicalActivity", [(("Never", "Rarely"), 2)]),
+    ("StressLevel", [(("Extremely",), 3), (("High",), 2)]),
+]
+
+
+def _rule_points(s: pd.Series, tiers) -> np.ndarray:
+    """Points per row for one rule, evaluated once per distinct answer."""
+    codes, uniques = answer_codes(s)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    conds = [text.str.contains("|".join(map(re.escape, kws)), regex=True).to_numpy() for kws, _ in tiers]
+    points = np.select(conds, [p for _, p in tiers], default=0)
+
+    # code -1 (missing answer) picks the trailing 0
+    return np.append(points, 0).astype(np.int64)[codes]
+
+
+@feature("Lifestyle_Risk", inputs=tuple(col for col, _ in LIFESTYLE_RISK_RULES))
+def _lifestyle_risk(cols, index):
+    risk = np.zeros(len(index), dtype=np.int64)
+    if any(cols[col] is None for col, _ in LIFESTYLE_RISK_RULES):
+        return risk
+    for col, tiers in LIFESTYLE_RISK_RULES:
+        risk += _rule_points(cols[col], tiers)
+    return risk
+
+
+# Risk flags: flag -> (column, answer pattern). Boolean columns, so pages
+# count a flag instead of rescanning the answer text on every rerun.
+RISK_FLAGS = {
+    "FrequentDeviceUse": ("DeviceUsage", r"Always|Often"),
+    "FrequentCaffeine": ("CaffeineConsumption", r"Always|Often"),
+    "LowPhysicalActivity": ("PhysicalActivity", r"Never|Rarely"),
+    "HighStress": ("StressLevel", r"High|Extremely"),
+    "LateBedtime": ("BedTime", r"After 12 AM"),
+}
+
+
+@feature(*RISK_FLAGS, inputs=tuple(col for col, _ in RISK_FLAGS.values()))
+def _risk_flags(cols, index):
+    return {
+        flag: answers_contain(cols[col], pattern) if cols[col] is not None else np.zeros(len(index), dtype=bool)
+        for flag, (col, pattern) in RISK_FLAGS.items()
+    }
+
+
+# ISI >= 15: moderate or severe clinical insomnia
+@feature("HighInsomniaRisk", inputs=("InsomniaSeverity_index",))
+def _high_insomnia_risk(cols, index):
+    if cols["InsomniaSeverity_index"] is None:
+        return np.zeros(len(index), dtype=bool)
+    return (cols["InsomniaSeverity_index"] >= 15).to_numpy(bool)
+
+
+# Materialized by data_loader at ingest, so every page starts with them.
+SHARED_FEATURES = (
+    "SleepHours_est", "InsomniaSeverity_index", "Lifestyle_Risk",
+    *RISK_FLAGS, "HighInsomniaRisk",
+)
@@ -0,0 +1,138 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from frame_cache import VersionedCache, frame_version
+from parsing import answer_codes
+
+
+# ============================================================
+# Filterable columns
+# ============================================================
+# column -> sidebar label
+FILTER_COLUMNS = {
+    "Faculty": "Faculty",
+    "YearOfStudy": "Year of study",
+    "Gender": "Gender",
+    "AgeGroup": "Age group",
+}
+DATE_COLUMN = "Timestamp"
+
+
+# ============================================================
+# Bitmap index
+# ============================================================
+# One packed bitset (1 bit per row, np.packbits) per answer of each filter
+# column. A selection ORs the bitsets of the chosen answers within a column
+# and ANDs them across columns, so it reads n/8 bytes per answer instead of
+# rescanning the columns. Date ranges are two binary searches over the
+# rows sorted by Timestamp.
+class BitmapIndex:
+    def __init__(self, df: pd.DataFrame, columns=FILTER_COLUMNS, date_column=DATE_COLUMN):
+        self.rows = len(df)
+        self.date_column = date_column
+        self.labels = {}
+        self._bits = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = answer_codes(df[col])
+            self.labels[col] = [str(u) for u in uniques]
+            self._bits[col] = np.packbits(codes[None, :] == np.arange(len(uniques))[:, None], axis=1)
+
+        ts = (
+            df[date_column].to_numpy(dtype="datetime64[ns]")
+            if date_column in df.columns else np.empty(0, dtype="datetime64[ns]")
+        )
+        valid = np.flatnonzero(~np.isnat(ts))
+        self._ts_order = valid[np.argsort(ts[valid], kind="stable")]
+        self._ts_sorted = ts[self._ts_order]
+
+    def date_bounds(self):
+        """(first, last) response date, or None without timestamps."""
+        if len(self._ts_sorted) == 0:
+            return None
+        return pd.Timestamp(self._ts_sorted[0]).date(), pd.Timestamp(self._ts_sorted[-1]).date()
+
+    def _none(self) -> np.ndarray:
+        return np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+
+    def _answer_bits(self, col: str, answers) -> np.ndarray:
+        labels = self.labels.get(col)
+        if labels is None:
+            return self._none()
+        pos = [labels.index(a) for a in answers if a in labels]
+        return np.bitwise_or.reduce(self._bits[col][pos], axis=0) if pos else self._none()
+
+    def _date_bits(self, start, end) -> np.ndarray:
+        """Rows answered on days start..end (inclusive)."""
+        lo = np.searchsorted(self._ts_sorted, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        hi = np.searchsorted(self._ts_sorted, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns"), side="left")
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[self._ts_order[lo:hi]] = True
+        return np.packbits(mask)
+
+    def select(self, filters: dict):
+        """
+        Packed bitset of the rows matching `filters` ({column: answers},
+        plus {date_column: (start, end)}), or None when nothing is filtered.
+        """
+        bits = None
+        for col, value in filters.items():
+            part = self._date_bits(*value) if col == self.date_column else self._answer_bits(col, value)
+            bits = part if bits is None else bits & part
+        return bits
+
+    def positions(self, bits) -> np.ndarray:
+        """Row positions set in `bits`."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows))
+
+
+_INDEXES = VersionedCache(max_entries=4, name="bitmap_indexes")
+
+
+def get_index(df: pd.DataFrame) -> BitmapIndex:
+    """BitmapIndex over `df`, built once per data version."""
+    return _INDEXES.get_or_compute("bitmap", frame_version(df), lambda: BitmapIndex(df))
+
+
+# ============================================================
+# Filtered views
+# ============================================================
+def normalize_filters(filters: dict) -> tuple:
+    """Hashable, order-independent form of `filters`; empty selections are dropped."""
+    key = []
+    for col, value in (filters or {}).items():
+        if not value:
+            continue
+        if col == DATE_COLUMN:
+            key.append((col, tuple(str(pd.Timestamp(v).date()) for v in value)))
+        else:
+            key.append((col, tuple(sorted(map(str, value)))))
+    return tuple(sorted(key))
+
+
+_VIEWS = VersionedCache(max_entries=32, max_bytes=256 * 1024 * 1024, name="filtered_views")
+
+
+def filtered_view(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """
+    Rows of `df` matching `filters`; `df` itself when nothing is filtered.
+    Views get their own data version and are cached per filter set: treat
+    them as read-only.
+    """
+    key = normalize_filters(filters)
+    if df is None or not key:
+        return df
+    version = frame_version(df)
+
+    def compute():
+        index = get_index(df)
+        out = df.take(index.positions(index.select(dict(key))))
+        # a subset is not an append of the parent's subset: drop the lineage
+        out.attrs = {k: v for k, v in df.attrs.items() if k not in ("parent_version", "appended_from")}
+        out.attrs["data_version"] = version + "/filter:" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8]
+        return out
+
+    return _VIEWS.get_or_compute("filtered", version, compute, key=key)
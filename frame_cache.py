@@ -0,0 +1,195 @@
+import hashlib
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Data version
+# ============================================================
+def frame_version(df: pd.DataFrame) -> str:
+    """
+    Cheap identity for a frame's content. The loader stamps
+    df.attrs["data_version"] (digest of the source CSV); anything else is
+    hashed once.
+    """
+    version = df.attrs.get("data_version")
+    if version is None:
+        sha = hashlib.sha1("\x1f".join(map(str, df.columns)).encode("utf-8"))
+        sha.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        version = sha.hexdigest()[:16]
+        df.attrs["data_version"] = version
+    return version
+
+
+# ============================================================
+# Versioned result cache
+# ============================================================
+def base_version(version: str) -> str:
+    """
+    The loaded data a version derives from: views append "/<suffix>"
+    (e.g. "/filter:<hash>", "/features:<hash>") to their frame's version.
+    """
+    return str(version).split("/", 1)[0]
+
+
+# base version -> generation, in the order the process first misses a
+# cache on it: every load is looked up as soon as it lands, so this is
+# load order, and a late store for older data can be told apart
+_GENERATIONS = OrderedDict()
+_GENERATIONS_MAX = 4096
+_GENERATIONS_LOCK = threading.Lock()
+_next_generation = itertools.count()
+
+
+def _generation(base: str) -> int:
+    with _GENERATIONS_LOCK:
+        if base not in _GENERATIONS:
+            _GENERATIONS[base] = next(_next_generation)
+            if len(_GENERATIONS) > _GENERATIONS_MAX:
+                _GENERATIONS.popitem(last=False)
+        return _GENERATIONS[base]
+
+
+def _sizeof(value, seen=None) -> int:
+    """Rough in-memory size of a cached value, in bytes."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_sizeof(v, seen) for v in value)
+    if isinstance(getattr(value, "nbytes", None), int):  # e.g. Arrow tables
+        return value.nbytes
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + _sizeof(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+# name -> cache, for cache_stats()
+_CACHES = {}
+
+
+class VersionedCache:
+    """
+    Results keyed by (namespace, data version, key).
+
+    Storing a result for newly loaded data (a new base version) evicts that
+    namespace's results for older data; views of the same data (filtered
+    slices, feature views) are kept side by side. A late result for older
+    data (e.g. a fragment rerun on the frame it started with) is stored as
+    a plain entry and evicts nothing. The cache is bounded by entry count
+    and, with `max_bytes`, by the estimated size of the stored values,
+    evicting least recently used entries first.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = None, name: str = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._latest = {}
+        self._lock = threading.Lock()
+        if name is not None:
+            _CACHES[name] = self
+
+    def _drop(self, full_key) -> None:
+        del self._entries[full_key]
+        self._bytes -= self._sizes.pop(full_key)
+
+    def peek(self, namespace: str, version: str, key=None):
+        """Stored result or None; neither counted nor computed."""
+        with self._lock:
+            return self._entries.get((namespace, version, key))
+
+    def get_or_compute(self, namespace: str, version: str, compute, key=None):
+        full_key = (namespace, version, key)
+        with self._lock:
+            if full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return self._entries[full_key]
+            self.misses += 1
+
+        base = base_version(version)
+        generation = _generation(base)
+        # computed outside the lock; a concurrent miss may compute twice
+        value = compute()
+        size = _sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if generation > self._latest.get(namespace, -1):
+                self._latest[namespace] = generation
+                for k in [k for k in self._entries if k[0] == namespace and base_version(k[1]) != base]:
+                    self._drop(k)
+            if full_key in self._entries:
+                self._drop(full_key)
+            self._entries[full_key] = value
+            self._sizes[full_key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes if self.max_bytes is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._latest.clear()
+
+
+def cache_stats() -> dict:
+    """stats() of every named cache."""
+    return {name: cache.stats() for name, cache in _CACHES.items()}
+
+
+# ============================================================
+# Page aggregates
+# ============================================================
+# What a page derives from its frame (metric values, chart tables), per
+# (data version, page, name). A filtered view's version includes its
+# normalized filter set, so popular slices are computed once and shared
+# by every session looking at them.
+PAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_PAGES = VersionedCache(max_entries=1024, max_bytes=PAGE_CACHE_MAX_BYTES, name="pages")
+
+
+def page_cached(df: pd.DataFrame, page: str, name: str, compute):
+    """`compute()` for this page's `name` over `df`. Treat the result as read-only."""
+    return _PAGES.get_or_compute(f"page:{page}", frame_version(df), compute, key=name)
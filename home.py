@@ -1,11 +1,52 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from data_loader import display_sidebar_info, get_df
+from dashboard import has_figure, home_metrics, page_figure
+from data_loader import display_sidebar_info, get_df, show_no_data
+from exports import EXPORT_FORMATS, export_bytes
 
 
-def pct(n, total):
-    return (n / total * 100) if total else 0
+RAW_PAGE_SIZES = [25, 50, 100, 500]
+
+
+@st.fragment
+def raw_data_section(df):
+    """
+    Raw responses, one page of rows at a time. A fragment: paging and
+    opening the expander rerun only this section, and a closed expander
+    builds nothing.
+    """
+    box = st.expander("📋 View Raw Survey Data", expanded=False, key="home_raw", on_change="rerun")
+    if not box.open:
+        return
+
+    with box:
+        col1, col2 = st.columns(2)
+        page_size = col1.selectbox("Rows per page", RAW_PAGE_SIZES, key="raw_page_size")
+        pages = max((len(df) - 1) // page_size + 1, 1)
+        page = col2.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key="raw_page")
+        page = min(int(page), pages)
+
+        start = (page - 1) * page_size
+        st.dataframe(
+            df.iloc[start:start + page_size],
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption(f"Rows {start + 1:,}–{min(start + page_size, len(df)):,} of {len(df):,}")
+
+        fmt = st.selectbox(
+            "Export format",
+            list(EXPORT_FORMATS),
+            format_func=lambda f: EXPORT_FORMATS[f]["label"],
+            key="raw_export_format",
+        )
+        spec = EXPORT_FORMATS[fmt]
+        # built on click, in the background, once per data version and format
+        st.download_button(
+            label=f"📥 Download Dataset ({spec['label']})",
+            data=lambda: export_bytes(df, fmt),
+            file_name=f"umk_insomnia_survey_data.{spec['extension']}",
+            mime=spec["mime"],
+        )
 
 
 def render():
@@ -14,10 +55,10 @@ def render():
     df = get_df()
 
     if df is None or len(df) == 0:
-        st.error("No data available.")
+        show_no_data()
         return
 
-    total = len(df)
+    metrics = home_metrics(df)
 
     # =========================
     # PAGE HEADER
@@ -54,40 +95,33 @@ def render():
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Total Responses", f"{total:,}")
+        st.metric("Total Responses", f"{metrics['total_responses']:,}")
 
     with col2:
-        if "SleepHours_est" in df:
+        if "avg_sleep_hours" in metrics:
             st.metric(
                 "Avg Sleep Duration",
-                f"{df['SleepHours_est'].mean():.2f} hours",
+                f"{metrics['avg_sleep_hours']:.2f} hours",
             )
         else:
             st.metric("Avg Sleep Duration", "N/A")
 
     with col3:
-        if "InsomniaSeverity_index" in df:
-            high_isi = (df["InsomniaSeverity_index"] >= 15).sum()
+        if "high_insomnia_risk" in metrics:
             st.metric(
                 "High Insomnia Risk",
-                f"{high_isi}",
-                f"{pct(high_isi, total):.1f}%",
+                f"{metrics['high_insomnia_risk']}",
+                f"{metrics['high_insomnia_risk_pct']:.1f}%",
             )
         else:
             st.metric("High Insomnia Risk", "N/A")
 
     with col4:
-        if "StressLevel" in df:
-            high_stress = (
-                df["StressLevel"]
-                .astype(str)
-                .str.contains("High|Extremely", na=False)
-                .sum()
-            )
+        if "high_stress" in metrics:
             st.metric(
                 "High Stress Levels",
-                f"{high_stress}",
-                f"{pct(high_stress, total):.1f}%",
+                f"{metrics['high_stress']}",
+                f"{metrics['high_stress_pct']:.1f}%",
             )
         else:
             st.metric("High Stress Levels", "N/A")
@@ -104,15 +138,8 @@ def render():
 
     # Insomnia Severity Distribution
     with col_left:
-        if "InsomniaSeverity_index" in df:
-            fig = px.histogram(
-                df,
-                x="InsomniaSeverity_index",
-                nbins=10,
-                title="Insomnia Severity Index (ISI) Distribution",
-            )
-            fig.update_layout(xaxis_title="ISI Score", yaxis_title="Number of Students")
-            st.plotly_chart(fig, use_container_width=True)
+        if has_figure(df, "home/o1"):
+            st.plotly_chart(page_figure(df, "home/o1"), use_container_width=True)
 
             st.caption(
                 "Figure O1. Distribution of insomnia severity index (ISI) scores among UMK students."
@@ -120,24 +147,8 @@ def render():
 
     # Faculty Distribution
     with col_right:
-        if "Faculty" in df:
-            faculty_counts = (
-                df["Faculty"].value_counts().head(10).reset_index()
-            )
-            faculty_counts.columns = ["Faculty", "Count"]
-
-            fig = px.bar(
-                faculty_counts,
-                x="Count",
-                y="Faculty",
-                orientation="h",
-                title="Top Faculties Represented in Survey",
-            )
-            fig.update_layout(
-                xaxis_title="Number of Students",
-                yaxis_title="Faculty",
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        if has_figure(df, "home/o2"):
+            st.plotly_chart(page_figure(df, "home/o2"), use_container_width=True)
 
             st.caption(
                 "Figure O2. Distribution of survey respondents across faculties (top 10)."
@@ -148,19 +159,7 @@ def render():
     # =========================
     # RAW DATA PREVIEW
     # =========================
-    with st.expander("📋 View Raw Survey Data", expanded=False):
-        st.dataframe(
-            df,
-            use_container_width=True,
-            hide_index=True,
-        )
-
-        st.download_button(
-            label="📥 Download Dataset (CSV)",
-            data=df.to_csv(index=False).encode("utf-8"),
-            file_name="umk_insomnia_survey_data.csv",
-            mime="text/csv",
-        )
+    raw_data_section(df)
 
 
 # Render page
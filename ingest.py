@@ -0,0 +1,360 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # snapshots are disabled without pyarrow
+    pa = pq = None
+
+from features import SHARED_FEATURES, compute_features
+from schema import COL_MAP, DTYPES, HEADER_MAP, SCHEMA_ID, TIMESTAMP_FORMATS, canonical_categorical, mark_canonical, norm_header, normalize_frame, timestamp_format_fits
+
+# ============================================================
+# Google Sheets (Published CSV)
+# ============================================================
+GOOGLE_SHEETS_URL = (
+    "https://docs.google.com/spreadsheets/d/e/"
+    "2PACX-1vSf4umx6QNDel99If8P2otizAHj7jEDxFIsqandbD0zYVzfDheZo2YVkK1_zknpDKjHnBuYWCINgcCe"
+    "/pub?output=csv"
+)
+
+def _add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Shared derived columns. Row-wise, so it can run on a delta only."""
+    for name, values in compute_features(df, SHARED_FEATURES).items():
+        df[name] = values
+    return df
+
+
+# ============================================================
+# Incremental ingest (conditional GET + appended-row delta)
+# ============================================================
+# Survives between refreshes: holds the last built frame and the HTTP
+# validators of the response it was built from.
+_INGEST_STATE = {"url": None, "etag": None, "last_modified": None, "digest": None, "frame": None}
+_INGEST_LOCK = threading.Lock()
+
+# Rows parsed per read_csv chunk; peak memory scales with this, not the sheet.
+CHUNK_ROWS = 5_000
+# Response bodies above this size are spooled to a temp file instead of RAM.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+def _fetch_sheet(url: str, etag=None, last_modified=None, timeout: float = 30):
+    """
+    Conditional GET of the published CSV.
+    Returns (body, etag, last_modified, digest); body is a seekable binary
+    file (caller closes it), or None when the server answers 304.
+    """
+    req = urllib.request.Request(url)
+    if etag:
+        req.add_header("If-None-Match", etag)
+    if last_modified:
+        req.add_header("If-Modified-Since", last_modified)
+
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+            sha = hashlib.sha1()
+            for block in iter(lambda: resp.read(1 << 16), b""):
+                sha.update(block)
+                body.write(block)
+            body.seek(0)
+            return body, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), sha.hexdigest()
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, last_modified, None
+        raise
+
+
+def _read_chunks(body, chunk_rows: int = None):
+    """
+    Yield normalized chunks of the CSV in `body` (`chunk_rows` rows each,
+    CHUNK_ROWS by default).
+    Only COL_MAP columns are parsed; closed-ended answers are read straight
+    into "category" so the full sheet never exists as object strings.
+    """
+    # Own the text wrapper: pandas closes the ones it creates, which would
+    # close `body` when a caller stops iterating early.
+    body.seek(0)
+    text = io.TextIOWrapper(body, encoding="utf-8", newline="")
+    try:
+        header = pd.read_csv(text, nrows=0).columns
+        text.seek(0)
+
+        usecols = [c for c in header if norm_header(c) in HEADER_MAP]
+        dtype = {c: "category" for c in usecols if DTYPES[HEADER_MAP[norm_header(c)]] == "category"}
+
+        # One timestamp layout for the whole sheet, settled as the chunks
+        # stream: a chunk whose days are all <= 12 reads the same month-first
+        # and day-first, so chunks are held back until one layout reads more
+        # dates than every other, then parsed in it. A sheet that never
+        # settles is month-first, as detect_timestamp_format() has it.
+        stamps = [c for c in usecols if HEADER_MAP[norm_header(c)] == "Timestamp"]
+        fits = np.zeros(len(TIMESTAMP_FORMATS), dtype=np.int64)
+        timestamp_format = None if stamps else TIMESTAMP_FORMATS[0]
+        held = []
+
+        for chunk in pd.read_csv(text, usecols=usecols, dtype=dtype, chunksize=chunk_rows or CHUNK_ROWS):
+            if timestamp_format is None:
+                held.append(chunk)
+                fits += timestamp_format_fits(chunk[stamps[0]])
+                best = int(np.argmax(fits))
+                if (fits == fits[best]).sum() > 1:
+                    continue
+                timestamp_format = TIMESTAMP_FORMATS[best]
+                for waiting in held:
+                    yield normalize_frame(waiting, timestamp_format)
+                held = []
+            else:
+                yield normalize_frame(chunk, timestamp_format)
+
+        for waiting in held:
+            yield normalize_frame(waiting, TIMESTAMP_FORMATS[int(np.argmax(fits))])
+    finally:
+        text.detach()
+
+
+def _concat_frames(frames: list) -> pd.DataFrame:
+    """Concatenate frames, unioning categories so categoricals survive."""
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    frames = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        answers = list(dict.fromkeys(c for f in frames for c in f[col].cat.categories))
+        for f in frames:
+            f[col] = canonical_categorical(col, f[col], answers)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _build_full(body) -> pd.DataFrame:
+    return _concat_frames([_add_derived_columns(chunk) for chunk in _read_chunks(body)])
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Per-row content hash (by value, so category order does not matter)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _build_appended(body, cached: pd.DataFrame):
+    """
+    Derive only the rows appended after `cached`, checking chunk by chunk
+    that the sheet still starts with the cached rows (every form column,
+    compared by row hash, in order).
+    Returns the merged frame, or None when a full rebuild is needed: an
+    edit, a deletion or a row inserted anywhere but at the end.
+    """
+    base_cols = [c for c in cached.columns if c in COL_MAP.values()]
+    cached_rows = _row_hashes(cached[base_cols])
+    seen = 0
+    new_parts = []
+
+    for chunk in _read_chunks(body):
+        if list(chunk.columns) != base_cols:
+            return None
+
+        old = min(len(chunk), len(cached_rows) - seen)
+        if not np.array_equal(_row_hashes(chunk.iloc[:old]), cached_rows[seen:seen + old]):
+            return None
+        seen += old
+
+        if old < len(chunk):
+            new_parts.append(_add_derived_columns(chunk.iloc[old:].copy()))
+
+    if seen != len(cached_rows):
+        return None
+    if not new_parts:
+        # the body changed (new digest) without new rows: an edit, rebuild
+        return None
+    return _concat_frames([cached, *new_parts])
+
+
+def ingest_sheet(url: str = GOOGLE_SHEETS_URL) -> pd.DataFrame:
+    """
+    Fetch the sheet and return the feature-engineered frame.
+
+    - 304 Not Modified -> the previous frame is returned as-is
+    - pure append      -> derived columns are computed on the new rows only
+    - anything else    -> full rebuild
+    """
+    with _INGEST_LOCK:
+        state = _INGEST_STATE
+        if state["url"] != url:
+            state.update(url=url, etag=None, last_modified=None, digest=None, frame=None)
+
+        cached = state["frame"]
+        body, etag, last_modified, digest = _fetch_sheet(
+            url,
+            etag=state["etag"] if cached is not None else None,
+            last_modified=state["last_modified"] if cached is not None else None,
+        )
+
+        if body is None:
+            return cached
+
+        with body:
+            if cached is not None and digest == state["digest"]:
+                state.update(etag=etag, last_modified=last_modified)
+                return cached
+
+            df = _build_appended(body, cached) if cached is not None else None
+            appended = df is not None and df is not cached
+            if df is None:
+                df = _build_full(body)
+            if df is not cached:
+                # cache key for everything derived from this frame (frame_cache)
+                df.attrs["data_version"] = digest[:16]
+                mark_canonical(df)
+                if appended:
+                    # lineage: rows before `appended_from` are `cached` (running_stats)
+                    df.attrs["parent_version"] = cached.attrs.get("data_version")
+                    df.attrs["appended_from"] = len(cached)
+
+        state.update(etag=etag, last_modified=last_modified, digest=digest, frame=df)
+        write_snapshot(df, {"url": url, "etag": etag, "last_modified": last_modified, "digest": digest})
+        return df
+
+
+def read_survey_file(path: str) -> pd.DataFrame:
+    """
+    Feature-engineered frame from a local copy of the sheet: a CSV
+    download, or Parquet (a snapshot, a dashboard export or any table
+    with the form's columns). Derived columns are always rebuilt.
+    """
+    sha = hashlib.sha1()
+    with open(path, "rb") as body:
+        for block in iter(lambda: body.read(1 << 16), b""):
+            sha.update(block)
+
+        if path.lower().endswith(".parquet"):
+            body.seek(0)
+            df = normalize_frame(pd.read_parquet(body))
+            df = _add_derived_columns(df[[c for c in df.columns if c in COL_MAP.values()]].copy())
+        else:
+            df = _build_full(body)
+
+    df.attrs = {"data_version": sha.hexdigest()[:16]}
+    return mark_canonical(df)
+
+
+# ============================================================
+# Persistent snapshot (warm start across restarts)
+# ============================================================
+SNAPSHOT_PATH = os.environ.get(
+    "UMK_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "survey_snapshot.parquet"),
+)
+# Bump whenever derived columns or their dtypes change.
+SNAPSHOT_SCHEMA_VERSION = 3
+# Snapshots older than this are not served (a blocking fetch is done instead).
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+_SNAPSHOT_META_KEY = b"umk_snapshot"
+
+
+def _schema_fingerprint() -> str:
+    """Changes whenever SNAPSHOT_SCHEMA_VERSION or the canonical schema changes."""
+    payload = json.dumps({"version": SNAPSHOT_SCHEMA_VERSION, "schema": SCHEMA_ID})
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def write_snapshot(df: pd.DataFrame, source: dict, path: str = SNAPSHOT_PATH) -> bool:
+    """
+    Persist the feature-engineered frame as Parquet, tagged with the schema
+    fingerprint and the source (url / etag / last_modified / digest).
+    Written to a temp file and renamed, so readers never see a partial file.
+    """
+    if pq is None:
+        return False
+
+    meta = {
+        "schema": _schema_fingerprint(),
+        "written_at": time.time(),
+        "source": source,
+    }
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), _SNAPSHOT_META_KEY: json.dumps(meta).encode("utf-8")}
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+    except (OSError, pa.ArrowException):
+        return False
+    return True
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH, max_age: float = SNAPSHOT_MAX_AGE):
+    """
+    Return (df, meta) for a usable snapshot, else (None, None).
+    A snapshot written under another schema fingerprint is deleted.
+    """
+    if pq is None or not os.path.exists(path):
+        return None, None
+
+    try:
+        raw_meta = (pq.read_schema(path).metadata or {}).get(_SNAPSHOT_META_KEY)
+        meta = json.loads(raw_meta) if raw_meta else {}
+    except (OSError, ValueError, pa.ArrowException):
+        return None, None
+
+    if meta.get("schema") != _schema_fingerprint():
+        invalidate_snapshot(path)
+        return None, None
+
+    if time.time() - meta.get("written_at", 0) > max_age:
+        return None, None
+
+    try:
+        df = pq.read_table(path).to_pandas()
+    except (OSError, pa.ArrowException):
+        return None, None
+    return df, meta
+
+
+def invalidate_snapshot(path: str = SNAPSHOT_PATH) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def warm_start(url: str):
+    """
+    Seed the ingest state from the snapshot. Returns the snapshot frame,
+    or None when there is no usable snapshot of `url`.
+    """
+    df, meta = read_snapshot()
+    if df is None or meta["source"].get("url") != url:
+        return None
+
+    source = meta["source"]
+    df.attrs["data_version"] = (source.get("digest") or "")[:16] or None
+    df.attrs.pop("parent_version", None)
+    df.attrs.pop("appended_from", None)
+    mark_canonical(df)
+    with _INGEST_LOCK:
+        if _INGEST_STATE["frame"] is None:
+            _INGEST_STATE.update(
+                url=url,
+                etag=source.get("etag"),
+                last_modified=source.get("last_modified"),
+                digest=source.get("digest"),
+                frame=df,
+            )
+        return _INGEST_STATE["frame"]
@@ -1,69 +1,33 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-from data_loader import display_sidebar_info, get_df
-from cleaning_aelyana import prepare_aelyana_data
+from dashboard import aelyana_frame, has_figure, page_figure, severe_metrics
+from data_loader import display_sidebar_info, get_df, show_no_data
+from sections import chart_section
 
 # NOTE: do not call st.set_page_config() here (app.py already does it)
 
-def safe_mode(s: pd.Series, default="N/A"):
-    s = s.dropna()
-    return s.mode().iloc[0] if not s.empty else default
-
-
 def render():
     display_sidebar_info()
 
     raw = get_df()
-    df = prepare_aelyana_data(raw)
+    df = aelyana_frame(raw)
 
     if df is None or df.empty:
-        st.error("No data available.")
+        show_no_data()
         return
 
-    academic_order = ["Below average", "Average", "Good", "Very good", "Excellent"]
-    insomnia_order = ["Low / No Insomnia", "Moderate Insomnia", "Severe Insomnia"]
-    freq_order = ["Never", "Rarely", "Sometimes", "Often", "Always"]
-    impact_order = ["No impact", "Minor impact", "Moderate impact", "Major impact", "Severe impact"]
-
-    # Categorical for order stability
-    if "AcademicPerformance" in df.columns:
-        df["AcademicPerformance"] = pd.Categorical(df["AcademicPerformance"], categories=academic_order, ordered=True)
-    if "Insomnia_Category" in df.columns:
-        df["Insomnia_Category"] = pd.Categorical(df["Insomnia_Category"], categories=insomnia_order, ordered=True)
-    for c in ["ConcentrationDifficulty", "DaytimeFatigue"]:
-        if c in df.columns:
-            df[c] = pd.Categorical(df[c], categories=freq_order, ordered=True)
-    if "AssignmentImpact" in df.columns:
-        df["AssignmentImpact"] = pd.Categorical(df["AssignmentImpact"], categories=impact_order, ordered=True)
-
     st.title("Interpretation Dashboard: Impact of Sleep Related Issues on Academic Performance")
     st.divider()
 
     # -----------------------------
     # Metrics: severe insomnia group
     # -----------------------------
-    severe = df[df["Insomnia_Category"] == "Severe Insomnia"] if "Insomnia_Category" in df.columns else df
     st.subheader("Key Findings: The Impact of Insomnia")
     col1, col2, col3, col4 = st.columns(4)
 
-    focus_risk = (
-        severe["ConcentrationDifficulty"].isin(["Often", "Always"]).mean() * 100
-        if "ConcentrationDifficulty" in severe.columns
-        else 0.0
-    )
-    fatigue_risk = (
-        severe["DaytimeFatigue"].isin(["Often", "Always"]).mean() * 100
-        if "DaytimeFatigue" in severe.columns
-        else 0.0
-    )
-    perf_level = safe_mode(severe["AcademicPerformance"]) if "AcademicPerformance" in severe.columns else "N/A"
-    assign_risk = (
-        severe["AssignmentImpact"].isin(["Major impact", "Severe impact"]).mean() * 100
-        if "AssignmentImpact" in severe.columns
-        else 0.0
-    )
+    metrics = severe_metrics(df)
+    focus_risk, fatigue_risk = metrics["focus_risk"], metrics["fatigue_risk"]
+    perf_level, assign_risk = metrics["perf_level"], metrics["assign_risk"]
 
     col1.metric(
         label="🧠 Concentration Difficulty", 
@@ -95,27 +59,11 @@ def render():
     # -----------------------------
     # Chart 1
     # -----------------------------
-    st.subheader("a) Concentration Difficulty by Insomnia Category")
-    if {"Insomnia_Category", "ConcentrationDifficulty"}.issubset(df.columns):
-        tab = pd.crosstab(df["Insomnia_Category"], df["ConcentrationDifficulty"], dropna=False)
-        melted = tab.reset_index().melt(
-            id_vars="Insomnia_Category",
-            var_name="ConcentrationDifficulty",
-            value_name="Count",
-        )
-        fig = px.bar(
-            melted,
-            x="Insomnia_Category",
-            y="Count",
-            color="ConcentrationDifficulty",
-            barmode="group",
-            title="Concentration Difficulty by Insomnia Category",
-            category_orders={"Insomnia_Category": insomnia_order, "ConcentrationDifficulty": freq_order},
-            color_discrete_sequence=px.colors.sequential.Sunset,
-            labels={"Count": "Number of Students", "Insomnia_Category": "Insomnia Level"},
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+    def chart_a():
+        if has_figure(df, "aelyana/a"):
+            fig = page_figure(df, "aelyana/a")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * Most students (64) have moderate insomnia, with "Sometimes" (36 students) being the most common focus problem.
         * Low / No Insomnia Group dominated by "Rarely" (9) and "Sometimes" (8) responses, serious disruptions ("Often"/"Always") are almost none.
@@ -125,29 +73,20 @@ def render():
         **Conclusion**
         * There is a direct relationship between insomnia severity and difficulty maintaining focus. Severe insomnia doesn't just mean less sleep but it creates a high risk of academic failure due to ongoing cognitive impairment.
         """)
-        st.divider()
-    else:
-        st.warning("Missing columns for Chart 1.")
+            st.divider()
+        else:
+            st.warning("Missing columns for Chart 1.")
+
+    chart_section("a) Concentration Difficulty by Insomnia Category", chart_a, key="aelyana_a", expanded=True)
 
     # -----------------------------
     # Chart 2
     # -----------------------------
-    st.subheader("b) Insomnia Severity Index Across GPA Categories")
-    if {"GPA", "InsomniaSeverity_index"}.issubset(df.columns):
-        gpa_order = sorted(df["GPA"].dropna().unique().tolist())
-        fig = px.box(
-            df,
-            x="GPA",
-            y="InsomniaSeverity_index",
-            color="GPA",
-            title="Insomnia Severity Index Across GPA Categories",
-            category_orders={"GPA": gpa_order},
-            color_discrete_sequence=px.colors.sequential.Sunset,
-            points="outliers",
-        )
-        fig.update_layout(showlegend=False, plot_bgcolor="rgba(0,0,0,0)")
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+    def chart_b():
+        if has_figure(df, "aelyana/b"):
+            fig = page_figure(df, "aelyana/b")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * As GPA decreases, the insomnia severity "box" shifts upward. Higher GPA is associated with more consistent and lower insomnia scores.
         * GPA 3.70 - 4.00 category show lowest median insomnia score (4), placing these students in the "Low/No Insomnia" category.
@@ -157,34 +96,20 @@ def render():
         **Conclusion**
         * Managing insomnia is a key factor in academic success. Students with the best grades tend to maintain the healthiest sleep profiles.
         """)
-        st.divider()
-    else:
-        st.warning("Missing columns for Chart 2.")
+            st.divider()
+        else:
+            st.warning("Missing columns for Chart 2.")
+
+    chart_section("b) Insomnia Severity Index Across GPA Categories", chart_b, key="aelyana_b")
 
     # -----------------------------
     # Chart 3
     # -----------------------------
-    st.subheader("c) Assignment Impact by Insomnia Category")
-    if {"Insomnia_Category", "AssignmentImpact"}.issubset(df.columns):
-        tab = pd.crosstab(df["Insomnia_Category"], df["AssignmentImpact"], dropna=False)
-        melted = tab.reset_index().melt(
-            id_vars="Insomnia_Category",
-            var_name="AssignmentImpact",
-            value_name="Student_Count",
-        )
-        fig = px.bar(
-            melted,
-            x="Insomnia_Category",
-            y="Student_Count",
-            color="AssignmentImpact",
-            title="Assignment Impact by Insomnia Category",
-            category_orders={"Insomnia_Category": insomnia_order, "AssignmentImpact": impact_order},
-            color_discrete_sequence=px.colors.sequential.Sunset,
-            barmode="stack",
-            labels={"Student_Count": "Number of Students"},
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+    def chart_c():
+        if has_figure(df, "aelyana/c"):
+            fig = page_figure(df, "aelyana/c")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * Low / No Insomnia: Even with good sleep, only 3 students reported "No impact," with most feeling at least a "Minor impact" (8) on their work.
         * Moderate Insomnia: A large spike in "Moderate" (28) and "Major" (13) impacts, indicating that sleep issues are starting to damage the quality of their assignment.
@@ -193,33 +118,20 @@ def render():
         **Conclusion**
         * The insomnia severity is directly correlates with academic disruption. As sleep health worsens, the ability to complete coursework effectively is significantly compromised.
         """)
-        st.divider()
-    else:
-        st.warning("Missing columns for Chart 3.")
+            st.divider()
+        else:
+            st.warning("Missing columns for Chart 3.")
+
+    chart_section("c) Assignment Impact by Insomnia Category", chart_c, key="aelyana_c")
 
     # -----------------------------
     # Chart 4
     # -----------------------------
-    st.subheader("d) Fatigue Level by Insomnia Severity")
-    if {"Insomnia_Category", "DaytimeFatigue"}.issubset(df.columns):
-        tab = pd.crosstab(df["Insomnia_Category"], df["DaytimeFatigue"], dropna=False)
-        melted = tab.reset_index().melt(
-            id_vars="Insomnia_Category",
-            var_name="DaytimeFatigue",
-            value_name="Count",
-        )
-        fig = px.bar(
-            melted,
-            x="Insomnia_Category",
-            y="Count",
-            color="DaytimeFatigue",
-            title="Fatigue Level by Insomnia Severity",
-            category_orders={"Insomnia_Category": insomnia_order, "DaytimeFatigue": freq_order},
-            color_discrete_sequence=px.colors.sequential.Sunset,
-            barmode="stack",
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+    def chart_d():
+        if has_figure(df, "aelyana/d"):
+            fig = page_figure(df, "aelyana/d")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * Low / No Insomnia: Most students feel energized, with "Rarely" (11) or "Never" (4) being the top responses.
         * Moderate Insomnia: A big shift where "Sometimes" (37) becomes the norm. The appearance of "Always" fatigued students (3) shows moderate issues can still cause persistent fatigue.
@@ -228,28 +140,21 @@ def render():
         **Conclusion**
         * There is a progressive increase in fatigue associated with sleep health. Fatigue acts as a barrier that may drive the concentration and performance issues seen throughout this study.
         """)
-        st.divider()
-    else:
-        st.warning("Missing columns for Chart 4.")
+            st.divider()
+        else:
+            st.warning("Missing columns for Chart 4.")
+
+    chart_section("d) Fatigue Level by Insomnia Severity", chart_d, key="aelyana_d")
 
     # -----------------------------
     # Chart 5
     # -----------------------------
-    st.subheader("e) Academic Performance by Insomnia Category")
-    if {"Insomnia_Category", "AcademicPerformance"}.issubset(df.columns):
-        fig = px.box(
-            df,
-            x="Insomnia_Category",
-            y="AcademicPerformance",
-            color="Insomnia_Category",
-            title="Academic Performance by Insomnia Category",
-            category_orders={"Insomnia_Category": insomnia_order, "AcademicPerformance": academic_order},
-            color_discrete_sequence=px.colors.sequential.Sunset,
-            points="outliers",
-        )
-        fig.update_layout(showlegend=False, yaxis=dict(autorange="reversed"))
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+    def chart_e():
+        if has_figure(df, "aelyana/e"):
+
+            fig = page_figure(df, "aelyana/e")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * Low/No Insomnia students feel the most confident, rating themselves between "Good" and "Very good".
         * Moderate Insomnia causes ratings to spread out. The median remains "Good," but the range drops to "Average".
@@ -258,53 +163,21 @@ def render():
         **Conclusion**
         * Insomnia severity has a negative correlation with academic self perception. Severe insomnia acts as a "ceiling" that makes it harder to achieve or feel like a high achiever.
         """)
-    else:
-        st.warning("Missing columns for Chart 5.")
+        else:
+            st.warning("Missing columns for Chart 5.")
+
+    chart_section("e) Academic Performance by Insomnia Category", chart_e, key="aelyana_e")
 
     # -----------------------------
     # Chart 6: Correlation Heatmap
     # -----------------------------
     st.divider()
-    st.subheader("f) Correlation Heatmap: Sleep Issues vs. Academic Outcomes")
-
-    corr_columns = [
-        'SleepHours_est',
-        'InsomniaSeverity_index',
-        'DaytimeFatigue_numeric',
-        'ConcentrationDifficulty_numeric',
-        'MissedClasses_numeric',
-        'AcademicPerformance_numeric',
-        'GPA_numeric',
-        'CGPA_numeric'
-    ]
-
-    # Only keep columns that exist
-    existing_cols = [c for c in corr_columns if c in df.columns]
-
-    if len(existing_cols) >= 2:
-        corr_matrix = df[existing_cols].corr()
-
-        fig = px.imshow(
-            corr_matrix,
-            text_auto=".2f",
-            aspect="auto",
-            color_continuous_scale='SUNSET',
-            zmin=-1,
-            zmax=1,
-            title="Correlation Heatmap: Sleep Issues vs. Academic Outcomes"
-        )
-
-        fig.update_layout(
-            height=600,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            title_font_size=18
-        )
-
-        #fig.update_xaxes(tickangle=45)
-
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown("""
+
+    def chart_f():
+        if has_figure(df, "aelyana/f"):
+            fig = page_figure(df, "aelyana/f")
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown("""
         **Key Insights**
         * Estimated sleep hours show a moderate positive correlation with Academic Performance (0.36), but have almost no relationship with actual GPA (0.05) or CGPA (0.01).
         * There is a strong internal correlation between Daytime Fatigue and Concentration Difficulty (0.63). Also, Insomnia Severity is a significant predictor of Fatigue (0.54) and Concentration Difficulty (0.38).
@@ -319,8 +192,10 @@ def render():
         sleep quality and treating insomnia rather than just trying to spend more hours in bed.
         """)
 
-    else:
-        st.warning("Not enough numeric variables available to generate correlation heatmap.")
+        else:
+            st.warning("Not enough numeric variables available to generate correlation heatmap.")
+
+    chart_section("f) Correlation Heatmap: Sleep Issues vs. Academic Outcomes", chart_f, key="aelyana_f")
 
 render()
 
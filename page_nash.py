@@ -1,18 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.io as pio
 
-from data_loader import display_sidebar_info, get_df
-
-pio.templates.default = "plotly_white"
-
-
-# ==========================================
-# Helper
-# ==========================================
-def pct(n, total):
-    return (n / total * 100) if total else 0.0
+from dashboard import nash_metrics, page_figure
+from data_loader import display_sidebar_info, get_df, show_no_data
+from sections import chart_section
 
 
 # ==========================================
@@ -23,11 +13,9 @@ def render():
 
     df = get_df()
     if df is None or df.empty:
-        st.error("No data available.")
+        show_no_data()
         return
 
-    total = len(df)
-
     st.title("Lifestyle & Stress Factors and Insomnia Severity")
     st.markdown(
         """
@@ -45,40 +33,24 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 
     col1, col2, col3, col4 = st.columns(4)
 
-    high_device = df["DeviceUsage"].astype(str).str.contains("Always|Often", na=False).sum()
-    high_caffeine = df["CaffeineConsumption"].astype(str).str.contains("Always|Often", na=False).sum()
-    low_activity = df["PhysicalActivity"].astype(str).str.contains("Never|Rarely", na=False).sum()
-    high_stress = df["StressLevel"].astype(str).str.contains("High|Extremely", na=False).sum()
+    metrics = nash_metrics(df)
 
-    col1.metric("📱 Frequent Device Use", f"{pct(high_device, total):.1f}%")
-    col2.metric("☕ High Caffeine Intake", f"{pct(high_caffeine, total):.1f}%")
-    col3.metric("🏃 Low Physical Activity", f"{pct(low_activity, total):.1f}%")
-    col4.metric("🎓 High Academic Stress", f"{pct(high_stress, total):.1f}%")
+    col1.metric("📱 Frequent Device Use", f"{metrics['frequent_device_use_pct']:.1f}%")
+    col2.metric("☕ High Caffeine Intake", f"{metrics['high_caffeine_pct']:.1f}%")
+    col3.metric("🏃 Low Physical Activity", f"{metrics['low_activity_pct']:.1f}%")
+    col4.metric("🎓 High Academic Stress", f"{metrics['high_stress_pct']:.1f}%")
 
     st.divider()
 
     # ==========================================
     # Figure C1 — Device Usage Distribution
     # ==========================================
-    st.subheader("Figure C1 — Device Usage Before Sleep")
-
-    device_counts = df["DeviceUsage"].value_counts().reset_index()
-    device_counts.columns = ["DeviceUsage", "Count"]
-
-    fig1 = px.bar(
-        device_counts,
-        x="DeviceUsage",
-        y="Count",
-        title="Distribution of Device Usage Frequency Before Sleep",
-    )
-    fig1.update_layout(
-        xaxis_title="Device Usage Frequency",
-        yaxis_title="Number of Students"
-    )
-    st.plotly_chart(fig1, use_container_width=True)
+    def figure_c1():
+        fig1 = page_figure(df, "nash/c1")
+        st.plotly_chart(fig1, use_container_width=True)
 
-    st.markdown(
-        """
+        st.markdown(
+            """
 **Key Insights**
 - The bar chart shows that device usage before sleep is **not evenly distributed**.
 - A visibly larger group of students reports using devices **often or always** compared to those who rarely or never use devices.
@@ -88,29 +60,21 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 - Since frequent device use is widespread, it represents a **population-level risk factor**.
 - Any association found later between device use and insomnia severity affects a **substantial portion of students**, increasing its practical importance.
         """
-    )
+        )
+
+    chart_section("Figure C1 — Device Usage Before Sleep", figure_c1, key="nash_c1", expanded=True)
 
     st.divider()
 
     # ==========================================
     # Figure C2 — Device Usage vs Insomnia Severity
     # ==========================================
-    st.subheader("Figure C2 — Insomnia Severity by Device Usage")
-
-    fig2 = px.box(
-        df,
-        x="DeviceUsage",
-        y="InsomniaSeverity_index",
-        title="Insomnia Severity Across Device Usage Levels",
-    )
-    fig2.update_layout(
-        xaxis_title="Device Usage Before Sleep",
-        yaxis_title="Insomnia Severity Index (ISI)"
-    )
-    st.plotly_chart(fig2, use_container_width=True)
+    def figure_c2():
+        fig2 = page_figure(df, "nash/c2")
+        st.plotly_chart(fig2, use_container_width=True)
 
-    st.markdown(
-        """
+        st.markdown(
+            """
 **Key Insights**
 - Median insomnia scores increase as device usage frequency increases.
 - Students who report **always using devices** before sleep show **higher central ISI values** and wider score spread.
@@ -120,29 +84,21 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 - This pattern suggests that **frequent pre-bed device use is associated with more severe insomnia symptoms**.
 - The increasing spread also indicates that heavy device use may exacerbate sleep problems for some students more than others.
         """
-    )
+        )
+
+    chart_section("Figure C2 — Insomnia Severity by Device Usage", figure_c2, key="nash_c2")
 
     st.divider()
 
     # ==========================================
     # Figure C3 — Caffeine Consumption vs ISI
     # ==========================================
-    st.subheader("Figure C3 — Insomnia Severity by Caffeine Consumption")
+    def figure_c3():
+        fig3 = page_figure(df, "nash/c3")
+        st.plotly_chart(fig3, use_container_width=True)
 
-    fig3 = px.box(
-        df,
-        x="CaffeineConsumption",
-        y="InsomniaSeverity_index",
-        title="Insomnia Severity Across Caffeine Consumption Levels",
-    )
-    fig3.update_layout(
-        xaxis_title="Caffeine Consumption Frequency",
-        yaxis_title="Insomnia Severity Index (ISI)"
-    )
-    st.plotly_chart(fig3, use_container_width=True)
-
-    st.markdown(
-        """
+        st.markdown(
+            """
 **Key Insights**
 - Students with **frequent caffeine consumption** show noticeably higher median insomnia severity.
 - Occasional or rare caffeine users tend to cluster at lower ISI scores.
@@ -152,30 +108,21 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 - Regular caffeine intake appears to be a **consistent contributor** to increased insomnia severity.
 - This supports the idea that stimulant exposure, especially later in the day, can systematically worsen sleep outcomes.
         """
-    )
+        )
+
+    chart_section("Figure C3 — Insomnia Severity by Caffeine Consumption", figure_c3, key="nash_c3")
 
     st.divider()
 
     # ==========================================
     # Figure C4 — Stress Level vs Insomnia Severity
     # ==========================================
-    st.subheader("Figure C4 — Insomnia Severity by Academic Stress Level")
-
-    fig4 = px.violin(
-        df,
-        x="StressLevel",
-        y="InsomniaSeverity_index",
-        box=True,
-        title="Insomnia Severity Across Academic Stress Levels",
-    )
-    fig4.update_layout(
-        xaxis_title="Academic Stress Level",
-        yaxis_title="Insomnia Severity Index (ISI)"
-    )
-    st.plotly_chart(fig4, use_container_width=True)
+    def figure_c4():
+        fig4 = page_figure(df, "nash/c4")
+        st.plotly_chart(fig4, use_container_width=True)
 
-    st.markdown(
-        """
+        st.markdown(
+            """
 **Key Insights**
 - The violin plot shows a **clear upward shift** in insomnia severity as stress levels increase.
 - High and extremely stressed students have both **higher medians** and **wider distributions**, indicating more severe and variable sleep problems.
@@ -185,30 +132,21 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 - Academic stress demonstrates the **strongest visual association** with insomnia severity among all factors examined.
 - This suggests stress is not only linked to sleep problems but may also amplify the effects of other lifestyle risks.
         """
-    )
+        )
+
+    chart_section("Figure C4 — Insomnia Severity by Academic Stress Level", figure_c4, key="nash_c4")
 
     st.divider()
 
     # ==========================================
     # Figure C5 — Lifestyle Risk Score vs ISI
     # ==========================================
-    st.subheader("Figure C5 — Combined Lifestyle Risk vs Insomnia Severity")
-
-    fig5 = px.scatter(
-        df,
-        x="Lifestyle_Risk",
-        y="InsomniaSeverity_index",
-        opacity=0.75,
-        title="Accumulated Lifestyle Risk Score vs Insomnia Severity",
-    )
-    fig5.update_layout(
-        xaxis_title="Lifestyle Risk Score",
-        yaxis_title="Insomnia Severity Index (ISI)"
-    )
-    st.plotly_chart(fig5, use_container_width=True)
+    def figure_c5():
+        fig5 = page_figure(df, "nash/c5")
+        st.plotly_chart(fig5, use_container_width=True)
 
-    st.markdown(
-        """
+        st.markdown(
+            """
 **Key Insights**
 - Points trend upward as lifestyle risk score increases, indicating a **positive association**.
 - Students with low risk scores rarely show high insomnia severity.
@@ -218,7 +156,9 @@ The focus is on identifying *which behaviours show stronger visual links* to hig
 - Insomnia severity appears to be **cumulative**, increasing as multiple unhealthy behaviours co-occur.
 - This reinforces the importance of **multi-factor interventions**, rather than focusing on a single lifestyle behaviour.
         """
-    )
+        )
+
+    chart_section("Figure C5 — Combined Lifestyle Risk vs Insomnia Severity", figure_c5, key="nash_c5")
 
     st.success(
         "Overall conclusion: Academic stress, frequent device usage, and regular caffeine consumption show clear and interpretable "
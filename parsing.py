@@ -0,0 +1,100 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Memoized parsing of survey answers
+# ============================================================
+# A Google Form column only holds a dozen or so distinct answers, so parsers
+# run once per distinct value; results are kept per parser across refreshes
+# and broadcast back to the rows with an integer take.
+_CACHE_MAX_ENTRIES = 4096
+_CACHES: dict = {}
+_LOCK = threading.Lock()
+
+
+def answer_codes(s: pd.Series):
+    """
+    (codes, uniques) for a column; code -1 marks a missing answer.
+    Categorical columns reuse their existing codes and categories.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), s.cat.categories
+    return pd.factorize(s)
+
+
+def _parser_cache(parser) -> dict:
+    with _LOCK:
+        cache = _CACHES.setdefault(parser, {})
+        if len(cache) > _CACHE_MAX_ENTRIES:
+            cache.clear()
+        return cache
+
+
+def map_answers(s: pd.Series, parser, dtype=float) -> pd.Series:
+    """
+    Equivalent to `s.map(parser)`, but `parser` runs once per distinct
+    answer (and not at all for answers already seen by an earlier call).
+    Missing answers get `parser(np.nan)`.
+    """
+    codes, uniques = answer_codes(s)
+    cache = _parser_cache(parser)
+
+    values = np.empty(len(uniques) + 1, dtype=dtype)
+    for i, answer in enumerate(uniques):
+        try:
+            values[i] = cache[answer]
+        except KeyError:
+            values[i] = cache[answer] = parser(answer)
+        except TypeError:  # unhashable answer
+            values[i] = parser(answer)
+    values[-1] = parser(np.nan)
+
+    # code -1 picks the trailing missing-answer slot
+    return pd.Series(values[codes], index=s.index, name=s.name)
+
+
+def map_answer_dict(s: pd.Series, mapping: dict, default=np.nan) -> pd.Series:
+    """`s.astype(str).map(mapping)` with `default` for unmapped/missing answers."""
+    codes, uniques = answer_codes(s)
+    values = np.array([mapping.get(str(u), default) for u in uniques] + [default], dtype=float)
+    return pd.Series(values[codes], index=s.index, name=s.name)
+
+
+def answers_contain(s: pd.Series, pattern: str) -> np.ndarray:
+    """Boolean per row: answer matches regex `pattern` (missing -> False)."""
+    codes, uniques = answer_codes(s)
+    hits = pd.Series(uniques, dtype=object).astype(str).str.contains(pattern, regex=True).to_numpy(bool)
+    return np.append(hits, False)[codes]
+
+
+# ============================================================
+# Parsers
+# ============================================================
+def sleep_hours_estimate(x) -> float:
+    """
+    Sleep duration answer -> hours:
+    "More than 8 hours" -> 8.5, "Less than 4 hours" -> 3.5,
+    "6–7 hours" -> 6.5, "9 or more hours" -> 9.0
+    """
+    if pd.isna(x):
+        return np.nan
+
+    s = str(x).strip().lower().replace("–", "-")
+    nums = re.findall(r"\d+(?:\.\d+)?", s)
+
+    if "more than" in s:
+        return float(nums[0]) + 0.5 if nums else np.nan
+
+    if "less than" in s:
+        return float(nums[0]) - 0.5 if nums else np.nan
+
+    if len(nums) >= 2:
+        return (float(nums[0]) + float(nums[1])) / 2
+    if len(nums) == 1:
+        return float(nums[0])
+
+    return np.nan
@@ -0,0 +1,294 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from frame_cache import VersionedCache, frame_version
+from parsing import answer_codes
+
+
+# ============================================================
+# Server-side distribution summaries
+# ============================================================
+# Box and violin charts are drawn from per-group summaries computed here
+# (quartiles, whiskers, distinct outlier values, a fixed-resolution KDE)
+# instead of shipping every row to Plotly, so the figure payload depends
+# on the number of groups, not respondents. Summaries are cached per data
+# version.
+KDE_POINTS = 100
+# Above this many distinct values a group's KDE is taken from binned counts.
+KDE_MAX_SUPPORT = 512
+
+_SUMMARIES = VersionedCache(max_entries=256, name="plot_summaries")
+
+
+def _groups(df: pd.DataFrame, x: str, y: str, order=None, y_order=None):
+    """
+    (labels, codes, values): x labels in plot order, each row's position in
+    `labels` (-1 = not plotted) and y as floats. A categorical y is plotted
+    at its position in `y_order` (or its own category order).
+    """
+    codes, uniques = answer_codes(df[x])
+    uniques = pd.Index(uniques).astype(str)
+    if order is None:
+        order = list(uniques) if isinstance(df[x].dtype, pd.CategoricalDtype) else sorted(uniques)
+    labels = [str(o) for o in order]
+    remap = pd.Index(labels).get_indexer(uniques)
+    codes = np.where(codes >= 0, np.append(remap, -1)[codes], -1)
+
+    ys = df[y]
+    if y_order is not None or isinstance(ys.dtype, pd.CategoricalDtype):
+        y_codes, y_uniques = answer_codes(ys)
+        y_labels = pd.Index(y_order if y_order is not None else y_uniques).astype(str)
+        pos = y_labels.get_indexer(pd.Index(y_uniques).astype(str)).astype(float)
+        pos[pos < 0] = np.nan
+        values = np.append(pos, np.nan)[y_codes]
+    else:
+        values = pd.to_numeric(ys, errors="coerce").to_numpy(dtype=float)
+
+    keep = (codes >= 0) & ~np.isnan(values)
+    return labels, codes[keep], values[keep]
+
+
+def _object_column(items) -> np.ndarray:
+    """1-D object array of `items` (which may themselves be arrays)."""
+    out = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        out[i] = item
+    return out
+
+
+def _box_stats(labels, codes, values) -> pd.DataFrame:
+    """Tukey box per group (linear quartiles, 1.5 IQR whiskers), vectorized over groups."""
+    k = len(labels)
+    order = np.lexsort((values, codes))
+    g, v = codes[order], values[order]
+    n = np.bincount(g, minlength=k)
+    start = np.concatenate([[0], np.cumsum(n)[:-1]])
+
+    def quantile(q):
+        pos = start + q * np.maximum(n - 1, 0)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, start + np.maximum(n - 1, 0))
+        lo, hi = np.minimum(lo, len(v) - 1), np.minimum(hi, len(v) - 1)
+        return v[lo] + (v[hi] - v[lo]) * (pos - np.floor(pos)) if len(v) else np.full(k, np.nan)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    inside = (v >= low[g]) & (v <= high[g])
+    lowerfence = np.full(k, np.inf)
+    upperfence = np.full(k, -np.inf)
+    np.minimum.at(lowerfence, g[inside], v[inside])
+    np.maximum.at(upperfence, g[inside], v[inside])
+
+    sums = np.bincount(g, weights=v, minlength=k)
+    stats = pd.DataFrame(
+        {"n": n, "q1": q1, "median": median, "q3": q3,
+         "lowerfence": lowerfence, "upperfence": upperfence, "mean": sums / np.maximum(n, 1)},
+        index=pd.Index(labels, name="group"),
+    )
+    stats.loc[stats["n"] == 0, ["q1", "median", "q3", "lowerfence", "upperfence", "mean"]] = np.nan
+
+    # distinct outlier values per group, with their counts
+    out_g, out_v = g[~inside], v[~inside]
+    pairs, counts = np.unique(np.column_stack([out_g, out_v]), axis=0, return_counts=True) if len(out_v) else (np.empty((0, 2)), np.empty(0))
+    stats["outliers"] = _object_column([pairs[pairs[:, 0] == i, 1] for i in range(k)])
+    stats["outlier_counts"] = _object_column([counts[pairs[:, 0] == i] for i in range(k)])
+    return stats
+
+
+def _kde(values: np.ndarray, points: int = KDE_POINTS):
+    """Gaussian KDE (Silverman bandwidth) on `points` grid values spanning data +- 2 bandwidths."""
+    n = len(values)
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(values.std(ddof=1) if n > 1 else 0.0, (q3 - q1) / 1.349) or values.std() or 1.0
+    bw = 1.059 * spread * n ** (-0.2)
+
+    support, weights = np.unique(values, return_counts=True)
+    if len(support) > KDE_MAX_SUPPORT:
+        weights, edges = np.histogram(values, bins=KDE_MAX_SUPPORT)
+        support = (edges[:-1] + edges[1:]) / 2
+
+    grid = np.linspace(values.min() - 2 * bw, values.max() + 2 * bw, points)
+    z = (grid[:, None] - support[None, :]) / bw
+    density = (np.exp(-0.5 * z * z) * weights).sum(axis=1) / (n * bw * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def distribution_summary(df: pd.DataFrame, x: str, y: str, order=None, y_order=None, kde: bool = False):
+    """Box stats per x group (plus "kde": (grid, density) when asked), cached per data version."""
+    key = (tuple(order) if order is not None else None, tuple(y_order) if y_order is not None else None, kde)
+
+    def compute():
+        labels, codes, values = _groups(df, x, y, order, y_order)
+        stats = _box_stats(labels, codes, values)
+        if kde:
+            stats["kde"] = _object_column([_kde(values[codes == i]) if n else None for i, n in enumerate(stats["n"])])
+        return stats
+
+    return _SUMMARIES.get_or_compute(f"dist:{x}:{y}", frame_version(df), compute, key=key)
+
+
+def _nice_width(span: float, nbins: int) -> float:
+    """Smallest 1/2/2.5/5 x 10^k bin width giving at most `nbins` bins over `span`."""
+    raw = span / max(nbins, 1) if span > 0 else 1.0
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for step in (1, 2, 2.5, 5, 10):
+        if step * magnitude >= raw:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def histogram_summary(df: pd.DataFrame, column: str, nbins: int = 10):
+    """
+    (edges, counts) of `column` over at most `nbins` bins of a round
+    width, aligned to multiples of it. Cached per data version.
+    """
+    def compute():
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return np.array([0.0, 1.0]), np.array([0])
+
+        lo, hi = values.min(), values.max()
+        width = _nice_width(hi - lo, nbins)
+        start = np.floor(lo / width) * width
+        count = max(int(np.floor((hi - start) / width)) + 1, 1)
+        edges = start + width * np.arange(count + 1)
+        counts, _ = np.histogram(values, bins=edges)
+        return edges, counts
+
+    return _SUMMARIES.get_or_compute(f"hist:{column}", frame_version(df), compute, key=nbins)
+
+
+# ============================================================
+# Figures
+# ============================================================
+def _color(colors, i):
+    return colors[i % len(colors)] if colors else None
+
+
+def _box_trace(stats: pd.DataFrame, x, name=None, color=None, width=None) -> go.Box:
+    return go.Box(
+        x=x,
+        q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+        lowerfence=stats["lowerfence"], upperfence=stats["upperfence"], mean=stats["mean"],
+        name=name, marker_color=color, line_color=color, width=width, boxpoints=False, showlegend=False,
+    )
+
+
+def _outlier_trace(stats: pd.DataFrame, x, color=None) -> go.Scatter:
+    xs = np.concatenate([[xi] * len(o) for xi, o in zip(x, stats["outliers"])] or [[]])
+    ys = np.concatenate(list(stats["outliers"]) or [[]])
+    counts = np.concatenate(list(stats["outlier_counts"]) or [[]])
+    return go.Scatter(
+        x=xs, y=ys, mode="markers", marker=dict(color=color, size=5), customdata=counts,
+        hovertemplate="%{y} (n=%{customdata})<extra></extra>", showlegend=False,
+    )
+
+
+def _categorical_yaxis(fig: go.Figure, y_order) -> None:
+    if y_order is not None:
+        fig.update_yaxes(tickmode="array", tickvals=list(range(len(y_order))), ticktext=list(y_order))
+
+
+def box_figure(df: pd.DataFrame, x: str, y: str, title=None, order=None, y_order=None,
+               colors=None, points="outliers") -> go.Figure:
+    """
+    Box plot of `y` per `x` group from precomputed statistics.
+    `colors` gives each group its own color (as px.box(color=x)).
+    """
+    stats = distribution_summary(df, x, y, order, y_order)
+    stats = stats[stats["n"] > 0]
+    fig = go.Figure()
+
+    groups = [(stats, list(stats.index), None)] if not colors else [
+        (stats.iloc[[i]], [label], _color(colors, i)) for i, label in enumerate(stats.index)
+    ]
+    for part, xs, color in groups:
+        fig.add_trace(_box_trace(part, xs, name=xs[0] if colors else None, color=color))
+        if points == "outliers":
+            fig.add_trace(_outlier_trace(part, xs, color))
+
+    fig.update_layout(title=title, boxmode="overlay", xaxis_title=x, yaxis_title=y)
+    fig.update_xaxes(type="category", categoryorder="array", categoryarray=list(order or stats.index))
+    _categorical_yaxis(fig, y_order)
+    return fig
+
+
+def violin_figure(df: pd.DataFrame, x: str, y: str, title=None, order=None, y_order=None,
+                  colors=None, box: bool = True, points="outliers") -> go.Figure:
+    """
+    Violin plot of `y` per `x` group: each KDE is drawn as a filled outline
+    (all violins scaled to the same maximum width), with an optional box.
+    """
+    stats = distribution_summary(df, x, y, order, y_order, kde=True)
+    labels = list(order) if order is not None else list(stats.index)
+    pos = {label: i for i, label in enumerate(labels)}
+    stats = stats[stats["n"] > 0]
+    fig = go.Figure()
+
+    for i, (label, row) in enumerate(stats.iterrows()):
+        grid, density = row["kde"]
+        half = density / density.max() * 0.4 if density.max() > 0 else density
+        color = _color(colors, i) or "#636efa"
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([pos[label] + half, (pos[label] - half)[::-1]]),
+            y=np.concatenate([grid, grid[::-1]]),
+            fill="toself", mode="lines", line=dict(color=color, width=1), opacity=0.6,
+            name=label, hoverinfo="name", showlegend=False,
+        ))
+        part = stats.loc[[label]]
+        if box:
+            fig.add_trace(_box_trace(part, [pos[label]], color=color, width=0.1))
+        if points == "outliers":
+            fig.add_trace(_outlier_trace(part, [pos[label]], color))
+
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    fig.update_xaxes(tickmode="array", tickvals=list(range(len(labels))), ticktext=labels,
+                     range=[-0.5, len(labels) - 0.5])
+    _categorical_yaxis(fig, y_order)
+    return fig
+
+
+def histogram_figure(df: pd.DataFrame, x: str, nbins: int = 10, title=None, colors=None) -> go.Figure:
+    """Histogram of `x` drawn as a bar trace over server-side bin counts."""
+    edges, counts = histogram_summary(df, x, nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate="%{customdata[0]:g}–%{customdata[1]:g}: %{y}<extra></extra>",
+        marker_color=_color(colors, 0),
+        showlegend=False,
+    ))
+    fig.update_layout(title=title, bargap=0, xaxis_title=x, yaxis_title="count")
+    return fig
+
+
+# ============================================================
+# Figure cache
+# ============================================================
+# Finished figures (after every update_layout / update_traces) are kept as
+# Plotly JSON per (data version, figure id); a filtered view's version
+# includes its filter set. A hit rebuilds the Figure without Plotly's
+# property validation, which is most of the cost of building one, so the
+# returned figure is for display only. UMK_FIGURE_CACHE=0 bypasses the
+# cache, e.g. while editing figure code.
+FIGURE_CACHE_ENABLED = os.environ.get("UMK_FIGURE_CACHE", "1") != "0"
+FIGURE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+_FIGURES = VersionedCache(max_entries=256, max_bytes=FIGURE_CACHE_MAX_BYTES, name="figures")
+
+
+def cached_figure(df: pd.DataFrame, figure_id: str, build) -> go.Figure:
+    """`build()` (returning the finished figure) for `df`, memoized per data version."""
+    if not FIGURE_CACHE_ENABLED:
+        return build()
+    spec = _FIGURES.get_or_compute(f"figure:{figure_id}", frame_version(df), lambda: build().to_json())
+    return go.Figure(json.loads(spec), _validate=False)
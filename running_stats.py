@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+
+from frame_cache import VersionedCache, frame_version
+from parsing import answer_codes, answers_contain
+
+
+# ============================================================
+# Stat specs
+# ============================================================
+# Each measure is a numeric column, or a 0/1 indicator of an answer:
+#   {"column": c}                     -> the column (missing rows skipped)
+#   {"column": c, "contains": regex}  -> answer matches
+#   {"column": c, "isin": [...]}      -> answer is one of
+#   {"column": c, "min": x}           -> value >= x
+# Indicators count missing answers as 0, like `.str.contains(na=False)`.
+STATS_SPECS = {
+    # Homepage, sidebar and Lifestyle Factors page (loader frame)
+    "overall": {
+        "by": None,
+        "measures": {
+            "sleep_hours": {"column": "SleepHours_est"},
+            "isi": {"column": "InsomniaSeverity_index"},
+            # risk flags materialized at ingest (features.RISK_FLAGS)
+            "high_isi": {"column": "HighInsomniaRisk"},
+            "high_device": {"column": "FrequentDeviceUse"},
+            "high_caffeine": {"column": "FrequentCaffeine"},
+            "low_activity": {"column": "LowPhysicalActivity"},
+            "high_stress": {"column": "HighStress"},
+        },
+    },
+    # Academic Impact page, per Insomnia_Category
+    "academic_impact": {
+        "by": "Insomnia_Category",
+        "measures": {
+            "focus_risk": {"column": "ConcentrationDifficulty", "isin": ["Often", "Always"]},
+            "fatigue_risk": {"column": "DaytimeFatigue", "isin": ["Often", "Always"]},
+            "assign_risk": {"column": "AssignmentImpact", "isin": ["Major impact", "Severe impact"]},
+        },
+    },
+    # Academic Impact page, correlation heatmap (measures named after their columns)
+    "academic_corr": {
+        "by": None,
+        "measures": {c: {"column": c} for c in (
+            "SleepHours_est",
+            "InsomniaSeverity_index",
+            "DaytimeFatigue_numeric",
+            "ConcentrationDifficulty_numeric",
+            "MissedClasses_numeric",
+            "AcademicPerformance_numeric",
+            "GPA_numeric",
+            "CGPA_numeric",
+        )},
+    },
+}
+
+
+def _measure_values(df: pd.DataFrame, spec: dict) -> np.ndarray:
+    col = spec["column"]
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    s = df[col]
+    if "contains" in spec:
+        return answers_contain(s, spec["contains"]).astype(float)
+    if "isin" in spec:
+        return s.isin(spec["isin"]).to_numpy(dtype=float)
+    values = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+    if "min" in spec:
+        return (values >= spec["min"]).astype(float)
+    return values
+
+
+# ============================================================
+# Running aggregates
+# ============================================================
+def _block(x: np.ndarray) -> dict:
+    """
+    Pairwise-complete moments of the rows of `x` (missing = NaN). Values
+    are shifted by their column mean first so the squares stay small.
+    """
+    present = ~np.isnan(x)
+    p = present.astype(float)
+    count = p.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = np.where(count > 0, np.nansum(x, axis=0) / count, 0.0)
+    x0 = np.where(present, x - shift, 0.0)
+
+    n = p.T @ p   # n[i, j]: rows with i and j present
+    s = x0.T @ p  # s[i, j]: shifted sum of i over those rows
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d = np.where(n > 0, s / n, 0.0)
+    return {
+        "rows": np.array(len(x), dtype=float),
+        "sum": np.nansum(x, axis=0),  # sum[i]: plain sum of i, exact for indicators
+        "n": n,
+        "mean": shift[:, None] + d,     # mean[i, j]: mean of i over those rows
+        "m2": (x0 * x0).T @ p - s * d,  # m2[i, j]: squared deviations of i from it
+        "c": x0.T @ x0 - s * d.T,       # c[i, j]: co-moment of i and j
+    }
+
+
+# Rows per _block: its temporaries are a few float copies of the measures,
+# so a fold's peak memory is bounded by this rather than by the frame.
+FOLD_ROWS = 2048
+
+
+def _merge(a: dict, b: dict) -> dict:
+    """Chan et al. pairwise update: the moments of two disjoint row sets combined."""
+    n = a["n"] + b["n"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(n > 0, b["n"] / n, 0.0)
+    delta = b["mean"] - a["mean"]
+    w = a["n"] * frac
+    return {
+        "rows": a["rows"] + b["rows"],
+        "sum": a["sum"] + b["sum"],
+        "n": n,
+        "mean": a["mean"] + delta * frac,
+        "m2": a["m2"] + b["m2"] + delta * delta * w,
+        "c": a["c"] + b["c"] + delta * delta.T * w,
+    }
+
+
+class RunningStats:
+    """
+    Mergeable aggregates of the measures, overall (group None) and per
+    category of `by`: row counts, plus pairwise-complete counts, means,
+    sums of squared deviations and co-moments. Folding in more rows, or
+    merging the stats of another set of rows, updates them without a
+    rescan; results match pandas' pairwise-complete statistics.
+    """
+
+    def __init__(self, measures: dict, by=None):
+        self.measures = dict(measures)
+        self.by = by
+        self.rows = 0
+        self._names = list(self.measures)
+        self._groups = {}
+
+    def copy(self) -> "RunningStats":
+        other = RunningStats(self.measures, self.by)
+        other.rows = self.rows
+        other._groups = {g: {k: v.copy() for k, v in acc.items()} for g, acc in self._groups.items()}
+        return other
+
+    def _add(self, group, block: dict) -> None:
+        acc = self._groups.get(group)
+        self._groups[group] = block if acc is None else _merge(acc, block)
+
+    def fold(self, df: pd.DataFrame) -> "RunningStats":
+        """Add the rows of `df`, FOLD_ROWS at a time (merged like any two row sets)."""
+        for start in range(0, len(df), FOLD_ROWS):
+            self._fold(df.iloc[start:start + FOLD_ROWS])
+        return self
+
+    def _fold(self, df: pd.DataFrame) -> None:
+        x = np.column_stack([_measure_values(df, self.measures[m]) for m in self._names])
+        self._add(None, _block(x))
+
+        if self.by is not None and self.by in df.columns:
+            codes, uniques = answer_codes(df[self.by])
+            for code in np.unique(codes[codes >= 0]):
+                self._add(str(uniques[code]), _block(x[codes == code]))
+
+        self.rows += len(df)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Add the stats of `other`, taken over a disjoint set of rows with the same spec."""
+        if other._names != self._names or other.by != self.by:
+            raise ValueError("Cannot merge stats with different measures.")
+        for group, acc in other._groups.items():
+            self._add(group, {k: v.copy() for k, v in acc.items()})
+        self.rows += other.rows
+        return self
+
+    def _stat(self, group, key: str, i: int, j: int) -> float:
+        acc = self._groups.get(group)
+        return float(acc[key][i, j]) if acc is not None else 0.0
+
+    def count(self, group=None) -> int:
+        acc = self._groups.get(group)
+        return int(acc["rows"]) if acc is not None else 0
+
+    def sum(self, measure: str, group=None) -> float:
+        acc = self._groups.get(group)
+        return float(acc["sum"][self._names.index(measure)]) if acc is not None else 0.0
+
+    def mean(self, measure: str, group=None) -> float:
+        i = self._names.index(measure)
+        return self._stat(group, "mean", i, i) if self._stat(group, "n", i, i) else np.nan
+
+    def var(self, measure: str, group=None) -> float:
+        """Sample variance (ddof=1)."""
+        i = self._names.index(measure)
+        n = self._stat(group, "n", i, i)
+        return max(self._stat(group, "m2", i, i), 0.0) / (n - 1) if n >= 2 else np.nan
+
+    def corr(self, a: str, b: str, group=None) -> float:
+        """Pearson correlation over rows where both measures are present."""
+        return float(self.corr_matrix([a, b], group).iloc[0, 1])
+
+    def corr_matrix(self, measures=None, group=None) -> pd.DataFrame:
+        """Pairwise-complete Pearson correlations, as `df[measures].corr()`."""
+        names = list(measures) if measures is not None else self._names
+        idx = [self._names.index(m) for m in names]
+        acc = self._groups.get(group)
+        if acc is None:
+            return pd.DataFrame(np.nan, index=names, columns=names)
+
+        ix = np.ix_(idx, idx)
+        n, m2, c = acc["n"][ix], acc["m2"][ix], acc["c"][ix]
+        denom = np.sqrt(np.maximum(m2, 0.0) * np.maximum(m2.T, 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = np.where((n >= 2) & (denom > 0), c / denom, np.nan)
+        r = np.clip(r, -1.0, 1.0)
+        diag = np.diag(r).copy()
+        np.fill_diagonal(r, np.where(np.isnan(diag), np.nan, 1.0))
+        return pd.DataFrame(r, index=names, columns=names)
+
+
+# ============================================================
+# Per-version store
+# ============================================================
+# The loader records lineage on appended frames: df.attrs["parent_version"]
+# is the frame it extended and df.attrs["appended_from"] the first new row.
+# Stats for such a frame are the parent's plus a fold of the new rows.
+_STORE = VersionedCache(max_entries=64, name="running_stats")
+
+
+def running_stats(df: pd.DataFrame, name: str) -> RunningStats:
+    """STATS_SPECS[name] over `df`. Treat the result as read-only."""
+    parent = _STORE.peek(f"stats:{name}", df.attrs.get("parent_version"))
+
+    def compute():
+        start = df.attrs.get("appended_from")
+        if parent is not None and start is not None and parent.rows == start:
+            return parent.copy().fold(df.iloc[start:])
+        return RunningStats(**STATS_SPECS[name]).fold(df)
+
+    return _STORE.get_or_compute(f"stats:{name}", frame_version(df), compute)
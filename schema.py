@@ -0,0 +1,209 @@
+import hashlib
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Column map (long Google Form question -> short name)
+# ============================================================
+COL_MAP = {
+    "Timestamp": "Timestamp",
+    "What is your gender?": "Gender",
+    "What is your age group?": "AgeGroup",
+    "What is your year of study?": "YearOfStudy",
+    "Which faculty are you currently enrolled in?": "Faculty",
+    "How often do you have difficulty falling asleep at night?": "DifficultyFallingAsleep",
+    "On average, how many hours of sleep do you get on a typical day?": "SleepHours",
+    "How often do you wake up during the night and have trouble falling back asleep?": "NightWakeups",
+    "How would you rate the overall quality of your sleep?": "SleepQuality",
+    "At what time do you usually go to bed on weekdays?": "BedTime",
+    "Do you usually nap during the day?": "DayNap",
+    "How often do you experience difficulty concentrating during lectures or studying due to lack of sleep?": "ConcentrationDifficulty",
+    "How often do you feel fatigued during the day, affecting your ability to study or attend classes?": "DaytimeFatigue",
+    "How often do you miss or skip classes due to sleep-related issues (e.g., insomnia, feeling tired)?": "MissedClasses",
+    "How would you describe the impact of insufficient sleep on your ability to complete assignments and meet deadlines?": "AssignmentImpact",
+    "During exam periods, how much does your sleep pattern change?": "ExamSleepChange",
+    "How would you rate your overall academic performance (GPA or grades) in the past semester?": "AcademicPerformance",
+    "What is your GPA range for the most recent semester?": "GPA",
+    "What is your CGPA range for the most recent semester?": "CGPA",
+    "How often do you use electronic devices (e.g., phone, computer) before going to sleep?": "DeviceUsage",
+    "How often do you consume caffeine (coffee, energy drinks) to stay awake or alert?": "CaffeineConsumption",
+    "How often do you engage in physical activity or exercise?": "PhysicalActivity",
+    "How would you describe your stress levels related to academic workload?": "StressLevel",
+    "Do you use any methods to help you sleep?": "SleepMethods",
+}
+
+# Timestamp layouts, one per sheet: Google Forms' month-first default, the
+# day-first one of sheets in a day-first locale, and ISO (CSV exports).
+TIMESTAMP_FORMATS = ("%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S", "ISO8601")
+
+# Canonical dtype per short column (closed-ended answers are categoricals).
+DTYPES = {short: "category" for short in COL_MAP.values()}
+DTYPES.update({"Timestamp": "datetime64[ns]", "SleepQuality": "float64"})
+
+
+# ============================================================
+# Canonical answer orders (dictionary-encoded storage)
+# ============================================================
+BEDTIME_ORDER = ["9–10 PM", "10–11 PM", "11 PM–12 AM", "After 12 AM"]
+FREQ_ORDER = ["Never", "Rarely", "Sometimes", "Often", "Always"]
+IMPACT_ORDER = ["No impact", "Minor impact", "Moderate impact", "Major impact", "Severe impact"]
+ACADEMIC_ORDER = ["Below average", "Average", "Good", "Very good", "Excellent"]
+GPA_ORDER = ["Below 2.00", "2.00 - 2.99", "3.00 - 3.69", "3.70 - 4.00"]
+SLEEP_HOURS_ORDER = ["Less than 4", "Less than 5", "4–5", "5–6", "6–7", "7–8", "8–9", "More than 8", "9 or more"]
+STRESS_ORDER = ["No", "Very low", "Low", "Moderate", "High", "Very high", "Extremely"]
+
+# Ordered columns: an answer ranks by the first entry it starts with (so
+# "Rarely (1–2 times a week)" sorts as "Rarely"); unmatched answers go last.
+# Other closed-ended columns are stored as unordered categoricals.
+CATEGORY_ORDERS = {
+    "DifficultyFallingAsleep": FREQ_ORDER,
+    "NightWakeups": FREQ_ORDER,
+    "ConcentrationDifficulty": FREQ_ORDER,
+    "DaytimeFatigue": FREQ_ORDER,
+    "MissedClasses": FREQ_ORDER,
+    "DeviceUsage": FREQ_ORDER,
+    "CaffeineConsumption": FREQ_ORDER,
+    "PhysicalActivity": FREQ_ORDER,
+    "SleepHours": SLEEP_HOURS_ORDER,
+    "BedTime": BEDTIME_ORDER,
+    "AssignmentImpact": IMPACT_ORDER,
+    "AcademicPerformance": ACADEMIC_ORDER,
+    "GPA": GPA_ORDER,
+    "CGPA": GPA_ORDER,
+    "StressLevel": STRESS_ORDER,
+}
+
+# Identifies this schema; frames enforced against it carry it in
+# df.attrs["schema"], and snapshots written under another one are dropped.
+SCHEMA_ID = hashlib.sha1(json.dumps({
+    "columns": sorted(COL_MAP.items()),
+    "dtypes": sorted(DTYPES.items()),
+    "timestamp_formats": TIMESTAMP_FORMATS,
+    "orders": sorted(CATEGORY_ORDERS.items()),
+}).encode("utf-8")).hexdigest()[:16]
+
+
+# ============================================================
+# Helpers
+# ============================================================
+def norm_header(s: str) -> str:
+    """
+    Normalize Google Form headers:
+    - remove trailing / repeated spaces
+    - remove newlines / tabs
+    - handle non-breaking spaces
+    """
+    s = str(s).replace("\u00A0", " ")
+    s = s.replace("\n", " ").replace("\t", " ")
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+# normalized header -> short name
+HEADER_MAP = {norm_header(k): v for k, v in COL_MAP.items()}
+
+
+def _norm_answer(x) -> str:
+    return str(x).strip().lower().replace("–", "-")
+
+
+def _sort_answers(col: str, answers) -> list:
+    order = [_norm_answer(o) for o in CATEGORY_ORDERS.get(col, [])]
+
+    def rank(answer):
+        key = _norm_answer(answer)
+        for i, prefix in enumerate(order):
+            if key.startswith(prefix):
+                return (i, key)
+        return (len(order), key)
+
+    return sorted(answers, key=rank)
+
+
+def canonical_categorical(col: str, s: pd.Series, answers=None) -> pd.Series:
+    """
+    Re-encode a categorical column with stripped labels in canonical order.
+    `answers` optionally widens the categories (e.g. union across chunks).
+    """
+    labels = s.cat.categories.astype(str).str.strip()
+    cats = _sort_answers(col, pd.unique(pd.Index(labels).append(pd.Index(answers or []))))
+
+    remap = pd.Index(cats).get_indexer(labels)
+    codes = s.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, remap[codes], -1)
+
+    cat = pd.Categorical.from_codes(codes, categories=cats, ordered=col in CATEGORY_ORDERS)
+    return pd.Series(cat, index=s.index, name=s.name)
+
+
+def timestamp_format_fits(s: pd.Series) -> np.ndarray:
+    """How many distinct dates in `s` each layout in TIMESTAMP_FORMATS reads."""
+    # a date is at most 10 characters: dedupe on those before splitting
+    prefixes = pd.Series(s.dropna().astype(str).str.slice(stop=10).unique())
+    dates = pd.Series(prefixes.str.partition(" ")[0].unique())
+    return np.array([pd.to_datetime(dates, format=fmt.split(" ")[0], errors="coerce").notna().sum() for fmt in TIMESTAMP_FORMATS])
+
+
+def detect_timestamp_format(s: pd.Series) -> str:
+    """
+    The layout in TIMESTAMP_FORMATS that fits the most distinct dates in
+    `s`, the earlier one on ties. Month-first and day-first only differ
+    once a day is past 12; until then the first (Google Forms') layout is
+    taken, as it is when no layout fits at all.
+    """
+    return TIMESTAMP_FORMATS[int(np.argmax(timestamp_format_fits(s)))]
+
+
+def parse_timestamp(s: pd.Series, timestamp_format: str = None) -> pd.Series:
+    """
+    `s` parsed in one layout, detect_timestamp_format(s) unless given.
+    Values in any other layout become NaT rather than being guessed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    return pd.to_datetime(s, format=timestamp_format or detect_timestamp_format(s), errors="coerce")
+
+
+# ============================================================
+# Enforcement
+# ============================================================
+def mark_canonical(df: pd.DataFrame) -> pd.DataFrame:
+    df.attrs["schema"] = SCHEMA_ID
+    return df
+
+
+def is_canonical(df: pd.DataFrame) -> bool:
+    return df.attrs.get("schema") == SCHEMA_ID
+
+
+def normalize_frame(df: pd.DataFrame, timestamp_format: str = None) -> pd.DataFrame:
+    """
+    Enforce the schema on `df` in place: clean headers, rename to short
+    names, parse Timestamp and apply the canonical dtypes / answer orders.
+    `timestamp_format` is the sheet's layout when `df` is a chunk of it.
+    """
+    df.columns = [norm_header(c) for c in df.columns]
+    df = df.rename(columns={c: HEADER_MAP[c] for c in df.columns if c in HEADER_MAP and HEADER_MAP[c] not in df.columns})
+
+    for col in df.columns:
+        dtype = DTYPES.get(col)
+        if dtype == "category":
+            s = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+            df[col] = canonical_categorical(col, s)
+        elif col == "Timestamp":
+            df[col] = parse_timestamp(df[col], timestamp_format).astype(dtype)
+        elif dtype is not None:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+
+    return mark_canonical(df)
+
+
+def canonicalize(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` itself when already canonical, else a normalized copy."""
+    if is_canonical(df):
+        return df
+    return normalize_frame(df.copy())
@@ -0,0 +1,166 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from parsing import map_answers
+
+
+# ============================================================
+# Answer -> points
+# ============================================================
+FREQUENCY_POINTS = {
+    "Never": 0,
+    "Rarely (1–2 times a month)": 1,
+    "Rarely (1–2 times a week)": 1,
+    "Rarely (1-2 times a month)": 1,
+    "Rarely (1-2 times a week)": 1,
+    "Rarely": 1,
+    "Occasionally": 2,
+    "Sometimes (3–4 times a week)": 2,
+    "Sometimes (3-4 times a week)": 2,
+    "Sometimes": 2,
+    "Frequently": 3,
+    "Often (5–6 times a week)": 3,
+    "Often (5-6 times a week)": 3,
+    "Often": 3,
+    "Always (every night)": 4,
+    "Always": 4,
+}
+
+
+def _frequency_points(x) -> float:
+    """Never..Always -> 0..4 (unknown answers score 0)."""
+    return float(FREQUENCY_POINTS.get(str(x).strip(), 0))
+
+
+def _quality_points(x) -> float:
+    """SleepQuality 1 (poor)..5 (excellent) -> 4..0 risk points."""
+    try:
+        q = float(x)
+    except (TypeError, ValueError):
+        return 0.0
+    if np.isnan(q):
+        return 0.0
+    return float(min(max(5 - q, 0), 4))
+
+
+POINT_MAPS = {
+    "frequency": _frequency_points,
+    "quality": _quality_points,
+}
+
+
+# ============================================================
+# Index specs
+# ============================================================
+# Each index is a weighted sum of component points, optionally rescaled
+# (raw / max_points * scale_to) and rounded, plus an optional category
+# column cut at `bins` (right=True -> upper bound inclusive).
+INDEX_SPECS = {
+    # Shared ISI-like score (0–28): data_loader and the Sleep Patterns page
+    "isi": {
+        "column": "InsomniaSeverity_index",
+        "components": [
+            {"column": "DifficultyFallingAsleep", "points": "frequency"},
+            {"column": "NightWakeups", "points": "frequency"},
+            {"column": "SleepQuality", "points": "quality"},
+        ],
+        "require_all": True,
+        "max_points": 12,
+        "scale_to": 28,
+        "round": 1,
+        "category": {
+            "column": "ISI_Category",
+            "bins": [8, 15, 22],
+            "right": False,
+            "labels": ["No insomnia (0–7)", "Subthreshold (8–14)", "Moderate (15–21)", "Severe (22–28)"],
+        },
+    },
+    # Four-component score (0–16): Academic Impact page
+    "isi_academic": {
+        "column": "InsomniaSeverity_index",
+        "components": [
+            {"column": "DifficultyFallingAsleep", "points": "frequency", "output": "FallingAsleep_Score"},
+            {"column": "NightWakeups", "points": "frequency", "output": "NightWakeups_Score"},
+            {"column": "SleepQuality", "points": "quality", "output": "SleepQuality_Score"},
+            {"column": "DaytimeFatigue", "points": "frequency", "output": "Fatigue_Score"},
+        ],
+        "require_all": False,
+        "category": {
+            "column": "Insomnia_Category",
+            "bins": [4, 8],
+            "right": True,
+            "labels": ["Low / No Insomnia", "Moderate Insomnia", "Severe Insomnia"],
+        },
+    },
+}
+
+
+# ============================================================
+# Compiled evaluator
+# ============================================================
+@lru_cache(maxsize=None)
+def _compile(names: tuple):
+    """
+    Lay the requested indexes out as one weight matrix: every distinct
+    (column, point map) input is encoded once and all indexes come out of
+    a single matrix product.
+    """
+    specs = [INDEX_SPECS[n] for n in names]
+    inputs = list(dict.fromkeys(
+        (c["column"], c["points"]) for spec in specs for c in spec["components"]
+    ))
+    weights = np.zeros((len(inputs), len(specs)))
+    for j, spec in enumerate(specs):
+        for c in spec["components"]:
+            weights[inputs.index((c["column"], c["points"])), j] += c.get("weight", 1)
+    return specs, inputs, weights
+
+
+def _categorize(scores: np.ndarray, category: dict) -> pd.Categorical:
+    side = "left" if category["right"] else "right"
+    codes = np.searchsorted(np.asarray(category["bins"], dtype=float), scores, side=side)
+    codes[np.isnan(scores)] = -1
+    return pd.Categorical.from_codes(codes, categories=category["labels"], ordered=True)
+
+
+def categorize(scores, name: str) -> pd.Categorical:
+    """Category column for an index's scores, per INDEX_SPECS[name]."""
+    return _categorize(np.asarray(scores, dtype=float), INDEX_SPECS[name]["category"])
+
+
+def compute_indexes(df: pd.DataFrame, names=tuple(INDEX_SPECS)) -> pd.DataFrame:
+    """
+    Evaluate the named indexes over `df` in one pass.
+    Returns a frame with each index column, its category column and any
+    per-component `output` columns.
+    """
+    specs, inputs, weights = _compile(tuple(names))
+
+    points = np.zeros((len(df), len(inputs)))
+    for k, (col, kind) in enumerate(inputs):
+        if col in df.columns:
+            points[:, k] = map_answers(df[col], POINT_MAPS[kind]).to_numpy()
+
+    raw = points @ weights
+
+    out = {}
+    for j, spec in enumerate(specs):
+        for c in spec["components"]:
+            if "output" in c:
+                out[c["output"]] = points[:, inputs.index((c["column"], c["points"]))]
+
+        score = raw[:, j]
+        if spec.get("require_all") and not {c["column"] for c in spec["components"]}.issubset(df.columns):
+            score = np.full(len(df), np.nan)
+        if "max_points" in spec:
+            score = score / spec["max_points"] * spec["scale_to"]
+        if "round" in spec:
+            score = np.round(score, spec["round"])
+        out[spec["column"]] = score
+
+        if "category" in spec:
+            out[spec["category"]["column"]] = _categorize(score, spec["category"])
+
+    return pd.DataFrame(out, index=df.index)
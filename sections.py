@@ -0,0 +1,30 @@
+import os
+
+import streamlit as st
+
+
+# ============================================================
+# Progressive page sections
+# ============================================================
+# Each chart section is an expander running as its own fragment: opening
+# or closing it reruns that section only, and a closed section builds
+# nothing, so the metrics at the top of a page never wait on the charts
+# below them. UMK_LAZY_SECTIONS=0 renders every section inline instead
+# (a plain top-to-bottom page).
+LAZY_SECTIONS = os.environ.get("UMK_LAZY_SECTIONS", "1") != "0"
+
+
+def chart_section(title: str, render, key: str, expanded: bool = False) -> None:
+    """`render()` under `title` as an independently re-runnable section."""
+    if not LAZY_SECTIONS:
+        st.subheader(title)
+        render()
+        return
+
+    def section():
+        box = st.expander(title, expanded=expanded, key=key, on_change="rerun")
+        if box.open:
+            with box:
+                render()
+
+    st.fragment(section)()
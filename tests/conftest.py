@@ -0,0 +1,50 @@
+import csv
+import io
+import os
+import sys
+
+import numpy as np
+
+# the app is a flat set of modules run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schema import CATEGORY_ORDERS, COL_MAP
+
+
+# answers for the columns without a canonical order
+ANSWERS = {
+    "Gender": ["Male", "Female"],
+    "AgeGroup": ["18-20", "21-23", "24 and above"],
+    "YearOfStudy": ["Year 1", "Year 2", "Year 3", "Year 4"],
+    "Faculty": ["FSDK", "FKP", "FHPK", "FTKW", "FIAT", "FBKT"],
+    "SleepQuality": ["1", "2", "3", "4", "5"],
+    "DayNap": ["Yes", "No", "Sometimes"],
+    "ExamSleepChange": ["No change", "Slight change", "Significant change"],
+    "SleepMethods": ["None", "Music", "Medication", "Reading"],
+}
+
+
+def survey_csv(rows, default: str = "Sometimes") -> bytes:
+    """
+    Published-sheet CSV body: the form's questions as headers, then one
+    line per row. A row maps short column names to answers; the others
+    get `default`, and a row without a Timestamp gets a January one.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(list(COL_MAP))
+    for i, row in enumerate(rows):
+        row = {"Timestamp": f"01/{i % 28 + 1:02d}/2025 10:{i // 60 % 60:02d}:{i % 60:02d}", **row}
+        writer.writerow([row.get(col, default) for col in COL_MAP.values()])
+    return out.getvalue().encode("utf-8")
+
+
+def random_rows(n: int, seed: int = 0) -> list:
+    """`n` rows of random answers to every closed question (for survey_csv)."""
+    rng = np.random.default_rng(seed)
+    picks = {}
+    for col in COL_MAP.values():
+        answers = CATEGORY_ORDERS.get(col) or ANSWERS.get(col)
+        if answers:
+            picks[col] = np.array(answers, dtype=object)[rng.integers(len(answers), size=n)]
+    return [{col: values[i] for col, values in picks.items()} for i in range(n)]
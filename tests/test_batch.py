@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from batch import _table
+from conftest import random_rows, survey_csv
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_batch_computes_every_page_without_streamlit(tmp_path):
+    data = tmp_path / "survey.csv"
+    data.write_bytes(survey_csv(random_rows(200)))
+    out = tmp_path / "out"
+
+    # a fresh interpreter: other tests may already have imported streamlit
+    script = (
+        "import sys, batch\n"
+        f"batch.main([{str(data)!r}, '-o', {str(out)!r}])\n"
+        "assert 'streamlit' not in sys.modules, 'batch imported streamlit'\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=REPO, check=True, capture_output=True)
+
+    manifest = json.loads((out / "manifest.json").read_text())
+    assert manifest["rows"] == 200
+    for page in manifest["pages"]:
+        assert json.loads((out / f"{page}.json").read_text())["rows"] == 200
+
+
+def test_table_leaves_the_cached_table_untouched():
+    # page_cached results are shared: _table must not relabel them in place
+    for table in (pd.DataFrame({1: [1, 2], 2: [3, 4]}), pd.DataFrame({1: [1, 2]}, index=pd.Index(["a", "b"], name="k"))):
+        before = table.copy()
+        assert all(isinstance(c, str) for c in _table(table).columns)
+        pd.testing.assert_frame_equal(table, before)
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from cube import Cube
+
+
+def test_crosstab_with_many_cells_matches_pandas():
+    # 14 x 14 answers: more cells than the int8 category codes can index
+    rng = np.random.default_rng(0)
+    labels = [f"a{i:02d}" for i in range(14)]
+    df = pd.DataFrame({
+        "row": pd.Categorical(rng.choice(labels, 2000), categories=labels),
+        "col": pd.Categorical(rng.choice(labels, 2000), categories=labels),
+    })
+    got = Cube(df).counts("row", "col")
+    expected = pd.crosstab(df["row"], df["col"])
+    assert np.array_equal(got.to_numpy(), expected.to_numpy())
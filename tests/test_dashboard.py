@@ -0,0 +1,29 @@
+from conftest import survey_csv
+from dashboard import device_counts, faculty_counts
+from filters import filtered_view
+from ingest import read_survey_file
+
+
+def test_counts_of_filtered_view_skip_empty_categories(tmp_path):
+    path = tmp_path / "survey.csv"
+    path.write_bytes(survey_csv([{"Faculty": f} for f in ["FBKT", "FBKT", "FHPK", "FKP"]]))
+    view = filtered_view(read_survey_file(str(path)), {"Faculty": ["FBKT"]})
+
+    faculties = faculty_counts(view)
+    assert faculties.to_dict("list") == {"Faculty": ["FBKT"], "Count": [2]}
+
+    devices = device_counts(view)
+    assert devices.to_dict("list") == {"DeviceUsage": ["Sometimes"], "Count": [2]}
+
+
+def test_tied_counts_keep_the_canonical_answer_order(tmp_path):
+    faculties = ["FTKW", "FKP", "FIAT", "FHPK", "FBKT", "FSDK"]
+    devices = ["Always", "Often", "Sometimes", "Rarely", "Never", "Never"]
+    rows = [{"Faculty": f, "DeviceUsage": d} for f, d in zip(faculties * 2 + ["FSDK"], devices * 2 + ["Never"])]
+    path = tmp_path / "survey.csv"
+    path.write_bytes(survey_csv(rows))
+    df = read_survey_file(str(path))
+
+    # largest first, then alphabetical for Faculty and the scale for DeviceUsage
+    assert faculty_counts(df)["Faculty"].tolist() == ["FSDK", "FBKT", "FHPK", "FIAT", "FKP", "FTKW"]
+    assert device_counts(df)["DeviceUsage"].tolist() == ["Never", "Rarely", "Sometimes", "Often", "Always"]
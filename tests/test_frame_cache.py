@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+from frame_cache import VersionedCache
+
+VERSIONS = itertools.count()
+
+
+@pytest.fixture
+def versions():
+    """Three base versions, loaded in order (names unseen by other tests)."""
+    run = next(VERSIONS)
+    return [f"test{run}-load{i}" for i in range(3)]
+
+
+def stored(cache, namespace, version, key=None) -> bool:
+    return cache.peek(namespace, version, key) is not None
+
+
+def test_new_data_evicts_older_data_but_not_views(versions):
+    old, new, _ = versions
+    cache = VersionedCache()
+    cache.get_or_compute("ns", old, lambda: "old")
+    cache.get_or_compute("ns", new, lambda: "new")
+    cache.get_or_compute("ns", f"{new}/filter:x", lambda: "view")
+    assert not stored(cache, "ns", old)
+    assert stored(cache, "ns", new) and stored(cache, "ns", f"{new}/filter:x")
+
+
+def test_stale_store_does_not_evict_newer_data(versions):
+    old, new, newest = versions
+    cache = VersionedCache()
+    cache.get_or_compute("ns", old, lambda: "old")
+    cache.get_or_compute("ns", new, lambda: "new")
+
+    # a rerun still holding the old frame: its result goes in beside the new one
+    cache.get_or_compute("ns", f"{old}/filter:x", lambda: "stale")
+    assert stored(cache, "ns", new) and stored(cache, "ns", f"{old}/filter:x")
+    assert cache.get_or_compute("ns", new, lambda: "recomputed") == "new"
+
+    cache.get_or_compute("ns", newest, lambda: "newest")
+    assert not stored(cache, "ns", new) and not stored(cache, "ns", f"{old}/filter:x")
@@ -0,0 +1,136 @@
+import functools
+import http.server
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import ingest
+from conftest import survey_csv
+
+ROWS = [{"Timestamp": f"01/{d:02d}/2025 10:00:00"} for d in range(1, 21)]
+APPENDED = {"Timestamp": "02/01/2025 10:00:00", "DeviceUsage": "Always"}
+
+
+@pytest.fixture
+def sheet(tmp_path, monkeypatch):
+    """
+    Stand-in for the published sheet: a local HTTP server for tmp_path.
+    Yields (url, write) where write(rows) replaces the served CSV.
+    """
+    path = tmp_path / "sheet.csv"
+    mtime = [time.time()]
+
+    def write(rows):
+        path.write_bytes(survey_csv(rows))
+        # Last-Modified has 1 s resolution: move it on, or the rewrite is a 304
+        mtime[0] += 10
+        os.utime(path, (mtime[0], mtime[0]))
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    monkeypatch.setattr(http.server.SimpleHTTPRequestHandler, "log_message", lambda *a: None)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(ingest, "write_snapshot", lambda *a, **k: False)
+    monkeypatch.setattr(ingest, "CHUNK_ROWS", 7)
+    ingest._INGEST_STATE.update(url=None, etag=None, last_modified=None, digest=None, frame=None)
+    yield f"http://127.0.0.1:{server.server_port}/sheet.csv", write
+    server.shutdown()
+
+
+def test_unchanged_sheet_returns_cached_frame(sheet):
+    url, write = sheet
+    write(ROWS)
+    first = ingest.ingest_sheet(url)
+    assert ingest.ingest_sheet(url) is first
+
+
+def test_append_extends_cached_frame(sheet):
+    url, write = sheet
+    write(ROWS)
+    first = ingest.ingest_sheet(url)
+
+    write(ROWS + [APPENDED])
+    df = ingest.ingest_sheet(url)
+    assert len(df) == len(ROWS) + 1
+    assert df.attrs["parent_version"] == first.attrs["data_version"]
+    assert df.attrs["appended_from"] == len(ROWS)
+    assert df["DeviceUsage"].iloc[-1] == "Always"
+
+
+def test_edited_row_is_picked_up(sheet):
+    url, write = sheet
+    write(ROWS)
+    first = ingest.ingest_sheet(url)
+
+    edited = list(ROWS)
+    edited[3] = {**edited[3], "DeviceUsage": "Never"}
+    write(edited)
+    df = ingest.ingest_sheet(url)
+    assert df is not first
+    assert df["DeviceUsage"].iloc[3] == "Never"
+    assert "parent_version" not in df.attrs
+
+
+def test_edit_alongside_append_is_picked_up(sheet):
+    url, write = sheet
+    write(ROWS)
+    ingest.ingest_sheet(url)
+
+    # row 10 sits in the second read_csv chunk (CHUNK_ROWS = 7)
+    edited = ROWS + [APPENDED]
+    edited[10] = {**edited[10], "DeviceUsage": "Never"}
+    write(edited)
+    df = ingest.ingest_sheet(url)
+    assert len(df) == len(ROWS) + 1
+    assert df["DeviceUsage"].iloc[10] == "Never"
+    assert "parent_version" not in df.attrs
+
+
+def test_row_inserted_mid_sheet_rebuilds_in_sheet_order(sheet):
+    url, write = sheet
+    write(ROWS)
+    ingest.ingest_sheet(url)
+
+    # the newest response, but not at the end of the sheet
+    inserted = ROWS[:5] + [APPENDED] + ROWS[5:]
+    write(inserted)
+    df = ingest.ingest_sheet(url)
+    assert len(df) == len(ROWS) + 1
+    assert df["DeviceUsage"].iloc[5] == "Always"
+    assert df["Timestamp"].iloc[-1] == pd.Timestamp("2025-01-20 10:00:00")
+    assert "parent_version" not in df.attrs
+
+
+def test_day_first_sheet_is_read_day_first_in_every_chunk(sheet):
+    url, write = sheet
+    # the first chunk (days 1-7) would also read as month-first
+    write([{"Timestamp": f"{d:02d}/02/2025 10:00:00"} for d in range(1, 21)])
+    df = ingest.ingest_sheet(url)
+    assert df["Timestamp"].tolist() == list(pd.date_range("2025-02-01 10:00", periods=20, freq="D"))
+
+
+def test_malformed_timestamp_does_not_abort_ingest(sheet):
+    url, write = sheet
+    rows = list(ROWS)
+    rows[4] = {"Timestamp": "01/05/2025 10:00"}
+    write(rows)
+    df = ingest.ingest_sheet(url)
+    assert len(df) == len(ROWS)
+    assert pd.isna(df["Timestamp"].iloc[4])
+    assert df["Timestamp"].notna().sum() == len(ROWS) - 1
+
+
+def test_timestamp_layout_is_settled_by_the_first_decisive_chunk(sheet):
+    url, write = sheet
+    # 13/02 settles day-first in the first chunk; the later chunks are
+    # parsed as they stream, so a month-first stray among them is NaT
+    rows = [{"Timestamp": f"{d:02d}/02/2025 10:00:00"} for d in range(13, 27)]
+    rows[10] = {"Timestamp": "02/25/2025 10:00:00"}
+    write(rows)
+    df = ingest.ingest_sheet(url)
+    assert pd.isna(df["Timestamp"].iloc[10])
+    assert df["Timestamp"].drop(index=10).tolist() == [pd.Timestamp(2025, 2, d, 10) for d in range(13, 27) if d != 23]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from conftest import random_rows, survey_csv
+from dashboard import aelyana_frame, severe_metrics
+from ingest import read_survey_file
+from running_stats import STATS_SPECS, RunningStats, running_stats
+
+PARENT_ROWS = 300
+
+
+@pytest.fixture
+def frames(tmp_path):
+    """(parent, child): the child is the parent plus appended rows, with lineage attrs."""
+    rows = random_rows(PARENT_ROWS + 100)
+    (tmp_path / "parent.csv").write_bytes(survey_csv(rows[:PARENT_ROWS]))
+    (tmp_path / "child.csv").write_bytes(survey_csv(rows))
+    parent = read_survey_file(str(tmp_path / "parent.csv"))
+    child = read_survey_file(str(tmp_path / "child.csv"))
+    child.attrs["parent_version"] = parent.attrs["data_version"]
+    child.attrs["appended_from"] = PARENT_ROWS
+    return parent, child
+
+
+def assert_same_stats(got: RunningStats, expected: RunningStats, groups):
+    assert got.rows == expected.rows
+    for group in [None, *groups]:
+        assert got.count(group) == expected.count(group)
+        for measure in expected.measures:
+            assert got.sum(measure, group) == pytest.approx(expected.sum(measure, group), rel=1e-12)
+            np.testing.assert_allclose(got.mean(measure, group), expected.mean(measure, group), rtol=1e-12)
+            np.testing.assert_allclose(got.var(measure, group), expected.var(measure, group), rtol=1e-9)
+        np.testing.assert_allclose(
+            got.corr_matrix(group=group).to_numpy(), expected.corr_matrix(group=group).to_numpy(),
+            rtol=1e-9, atol=1e-12,
+        )
+
+
+@pytest.mark.parametrize("name, page_frame", [
+    ("overall", lambda df: df),
+    ("academic_impact", aelyana_frame),
+    ("academic_corr", aelyana_frame),
+])
+def test_appended_frame_folds_only_new_rows(frames, monkeypatch, name, page_frame):
+    parent, child = (page_frame(f) for f in frames)
+    running_stats(parent, name)
+
+    folded = []
+    fold = RunningStats.fold
+    monkeypatch.setattr(RunningStats, "fold", lambda self, df: folded.append(len(df)) or fold(self, df))
+    got = running_stats(child, name)
+    assert folded == [len(child) - PARENT_ROWS]
+
+    by = STATS_SPECS[name]["by"]
+    groups = child[by].dropna().unique() if by is not None else []
+    assert_same_stats(got, fold(RunningStats(**STATS_SPECS[name]), child), groups)
+
+
+def test_severe_metrics_do_not_depend_on_lineage(frames):
+    parent, child = frames
+    severe_metrics(aelyana_frame(parent))
+    with_lineage = severe_metrics(aelyana_frame(child))
+
+    plain = child.copy(deep=False)
+    plain.attrs = {k: v for k, v in child.attrs.items() if k not in ("parent_version", "appended_from")}
+    plain.attrs["data_version"] += "-plain"
+    without_lineage = severe_metrics(aelyana_frame(plain))
+
+    assert with_lineage == pytest.approx(without_lineage, rel=1e-12)
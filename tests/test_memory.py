@@ -0,0 +1,88 @@
+import gc
+import itertools
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning_aelyana import AELYANA_ALIASES
+from conftest import random_rows, survey_csv
+from dashboard import FIGURES, PAGES, page_figure, page_frame
+from ingest import read_survey_file
+
+ROWS = 20000
+VERSIONS = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def survey(tmp_path_factory):
+    """Loader frame of ROWS random responses."""
+    path = tmp_path_factory.mktemp("survey") / "survey.csv"
+    path.write_bytes(survey_csv(random_rows(ROWS)))
+    return read_survey_file(str(path))
+
+
+def _buffer(s: pd.Series) -> np.ndarray:
+    return s.array.codes if isinstance(s.dtype, pd.CategoricalDtype) else s.to_numpy()
+
+
+def _render(df: pd.DataFrame, page: str, figures: bool = True) -> None:
+    """
+    Rendering `page`: its frame, metrics and figure tables, then its
+    figures unless `figures` is false.
+    """
+    pdf = page_frame(df, page)
+    PAGES[page]["metrics"](pdf)
+    for figure_id, spec in FIGURES.items():
+        if figure_id.startswith(page + "/") and spec["available"](pdf):
+            for table in spec["tables"].values():
+                table(pdf)
+            if not figures:
+                continue
+            page_figure(pdf, figure_id)
+            # plotly figures are reference cycles: free each one as a
+            # session would, instead of whenever the collector next runs
+            gc.collect()
+
+
+def _new_version(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` as a data version no cache has seen."""
+    fresh = df.copy(deep=False)
+    fresh.attrs = {**df.attrs, "data_version": f"{df.attrs['data_version']}-test{next(VERSIONS)}"}
+    return fresh
+
+
+def _peak(df: pd.DataFrame, page: str, figures: bool = True) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _render(df, page, figures)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("page", list(PAGES))
+def test_page_frame_shares_base_columns(survey, page):
+    pdf = page_frame(survey, page)
+    # the Academic Impact page replaces these with its own variants
+    replaced = AELYANA_ALIASES if page == "aelyana" else {}
+    for col in survey.columns.difference(list(replaced)):
+        assert np.shares_memory(_buffer(pdf[col]), _buffer(survey[col])), col
+
+
+@pytest.mark.parametrize("page", list(PAGES))
+def test_peak_memory_per_render(survey, page):
+    _render(survey, page)  # the first session builds the shared features
+    # later sessions allocate no per-render copy of the frame (a cached
+    # figure still costs a go.Figure built from its JSON on every render)
+    assert _peak(survey, page, figures=False) < survey.memory_usage(deep=True).sum() / 20
+
+
+@pytest.mark.parametrize("page", list(PAGES))
+def test_peak_memory_per_new_data_version(survey, page):
+    _render(_new_version(survey), page)  # imports and plotly's lazy setup
+    # a new version rebuilds the page's features, cube and tables, and keeps
+    # them cached, but each step works on the columns it needs: a few frames
+    assert _peak(_new_version(survey), page) < 3 * survey.memory_usage(deep=True).sum()
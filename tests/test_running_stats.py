@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from running_stats import RunningStats
+
+COLUMNS = ["a", "b", "c", "d"]
+MEASURES = {c: {"column": c} for c in COLUMNS}
+
+
+@pytest.fixture
+def frame():
+    """Correlated measures with scattered NaNs, and a grouping column."""
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=400)
+    df = pd.DataFrame({
+        "a": base * 3 + 100,
+        "b": base + rng.normal(scale=0.5, size=400),
+        "c": rng.normal(size=400),
+        "d": -base + rng.normal(scale=2, size=400),
+    })
+    for col in COLUMNS:
+        df.loc[rng.random(400) < 0.15, col] = np.nan
+    df["g"] = pd.Categorical(rng.choice(["x", "y", "z"], 400))
+    return df
+
+
+def assert_same_corr(stats: RunningStats, expected: pd.DataFrame, group=None):
+    got = stats.corr_matrix(list(expected.columns), group)
+    np.testing.assert_array_equal(np.isnan(got.to_numpy()), np.isnan(expected.to_numpy()))
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+def test_corr_matrix_matches_pandas(frame):
+    stats = RunningStats(MEASURES, by="g").fold(frame)
+    assert_same_corr(stats, frame[COLUMNS].corr())
+    for group, rows in frame.groupby("g", observed=True):
+        assert_same_corr(stats, rows[COLUMNS].corr(), group)
+    for col in COLUMNS:
+        assert stats.mean(col) == pytest.approx(frame[col].mean(), rel=1e-12)
+        assert stats.var(col) == pytest.approx(frame[col].var(), rel=1e-12)
+
+
+def test_merge_of_halves_equals_single_fold(frame):
+    whole = RunningStats(MEASURES, by="g").fold(frame)
+    merged = RunningStats(MEASURES, by="g").fold(frame.iloc[:150]).merge(
+        RunningStats(MEASURES, by="g").fold(frame.iloc[150:])
+    )
+    assert merged.rows == whole.rows
+    for group in (None, "x", "y", "z"):
+        assert merged.count(group) == whole.count(group)
+        assert_same_corr(merged, whole.corr_matrix(group=group), group)
+        for col in COLUMNS:
+            assert merged.sum(col, group) == pytest.approx(whole.sum(col, group), rel=1e-12)
+            assert merged.var(col, group) == pytest.approx(whole.var(col, group), rel=1e-12)
+
+
+def test_constant_and_sparse_columns_give_pandas_nans():
+    df = pd.DataFrame({
+        "a": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "const": [3.0] * 5,
+        # a single row overlaps with "a": no correlation
+        "sparse": [np.nan, np.nan, np.nan, np.nan, 7.0],
+    })
+    stats = RunningStats({c: {"column": c} for c in df.columns}).fold(df)
+    assert_same_corr(stats, df.corr())
+    assert np.isnan(stats.corr("a", "const"))
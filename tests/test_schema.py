@@ -0,0 +1,27 @@
+import pandas as pd
+
+from schema import parse_timestamp
+
+
+def test_month_first_timestamps():
+    ts = parse_timestamp(pd.Series(["1/5/2025 9:03:00", "12/31/2025 23:59:59", None]))
+    assert ts.tolist()[:2] == [pd.Timestamp("2025-01-05 09:03:00"), pd.Timestamp("2025-12-31 23:59:59")]
+    assert pd.isna(ts.iloc[2])
+
+
+def test_day_first_timestamps_are_read_day_first_throughout():
+    # 05/02 alone could be either; 13/02 makes the whole column day-first
+    ts = parse_timestamp(pd.Series(["05/02/2025 10:00:00", "13/02/2025 10:00:00"]))
+    assert ts.tolist() == [pd.Timestamp("2025-02-05 10:00:00"), pd.Timestamp("2025-02-13 10:00:00")]
+
+
+def test_timestamps_in_another_layout_become_nat():
+    ts = parse_timestamp(pd.Series(["01/05/2025 10:00:00", "01/06/2025 10:00", "not a date", "2025-01-07 10:00:00"]))
+    assert ts.iloc[0] == pd.Timestamp("2025-01-05 10:00:00")
+    assert ts.iloc[1:].isna().all()
+
+
+def test_day_first_layout_survives_a_stray_value():
+    ts = parse_timestamp(pd.Series(["13/02/2025 10:00:00", "05/02/2025 10:00:00", "n/a"]))
+    assert ts.tolist()[:2] == [pd.Timestamp("2025-02-13 10:00:00"), pd.Timestamp("2025-02-05 10:00:00")]
+    assert pd.isna(ts.iloc[2])